@@ -0,0 +1,229 @@
+"""
+Bratwurst Frühwarnsystem - Frontend-Benchmark für die generierte Seite
+Rendert synthetische Datensätze wachsender Größe mit generate_html, lädt sie in einem
+lokalen headless Chrome und misst DOM-Größe, First Paint, Speicher und die Suchlatenz
+pro Tastendruck - ohne stw.berlin, nur Chrome und ChromeDriver werden gebraucht.
+
+Beispiele:
+    python benchmarks/bench_frontend.py --sizes 3x20,10x60,30x365 --output frontend_results.json
+    python benchmarks/bench_frontend.py --baseline frontend_results.json --threshold 0.25
+"""
+
+from datetime import datetime
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium import webdriver  # noqa: E402
+from selenium.webdriver.chrome.options import Options  # noqa: E402
+
+import mensa_assets  # noqa: E402
+import mensa_model  # noqa: E402
+import mensa_watchlist  # noqa: E402
+import scrape_mensen  # noqa: E402
+from bench_pipeline import compare, synthetic_data  # noqa: E402
+
+# Mensen x Tage - von heute (3 Mensen, ein Monat) bis deutlich darüber hinaus
+DEFAULT_SIZES = "3x20,10x60,30x180,30x365"
+DEFAULT_QUERIES = "bratwurst,vegan,kartoffel"
+# Werte, bei denen eine Verschlechterung gegenüber der Baseline als Regression zählt
+REGRESSION_METRICS = ("html_kb", "dom_nodes", "first_contentful_paint_ms", "heap_mb", "keystroke_median_ms")
+
+# Wartet zwei Frames, damit Paint-Einträge nach dem load-Event sicher vorliegen
+WAIT_FOR_PAINT_JS = """
+const done = arguments[arguments.length - 1];
+requestAnimationFrame(() => requestAnimationFrame(() => done()));
+"""
+LOAD_METRICS_JS = """
+const paint = {};
+performance.getEntriesByType('paint').forEach(entry => { paint[entry.name] = entry.startTime; });
+const navigation = performance.getEntriesByType('navigation')[0];
+return {
+    first_paint_ms: paint['first-paint'],
+    first_contentful_paint_ms: paint['first-contentful-paint'],
+    dom_content_loaded_ms: navigation ? navigation.domContentLoadedEventEnd : undefined,
+    load_ms: navigation ? navigation.loadEventEnd : undefined,
+    dom_elements: document.getElementsByTagName('*').length,
+};
+"""
+# Ein Tastendruck: Suchfeld setzen, input-Event auslösen, Zeit bis zum nächsten Frame messen.
+# Der Debounce der Seite wird dabei übersprungen, gemessen wird nur die Suche selbst.
+KEYSTROKE_JS = """
+const query = arguments[0];
+const done = arguments[arguments.length - 1];
+const input = document.getElementById('searchInput');
+const originalSetTimeout = window.setTimeout;
+window.setTimeout = callback => { callback(); return 0; };
+const started = performance.now();
+try {
+    input.value = query;
+    input.dispatchEvent(new Event('input'));
+    document.body.offsetHeight;
+} finally {
+    window.setTimeout = originalSetTimeout;
+}
+const script = performance.now() - started;
+requestAnimationFrame(() => originalSetTimeout(() => done([script, performance.now() - started]), 0));
+"""
+
+def parse_sizes(text):
+    """'3x20,30x365' -> [(3, 20), (30, 365)]"""
+    sizes = []
+    for size in text.split(","):
+        mensen, days = size.lower().split("x")
+        sizes.append((int(mensen), int(days)))
+    return sizes
+
+def setup_driver():
+    """Headless Chrome mit genauen Speicherwerten (performance.memory ist sonst gerundet)"""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--enable-precise-memory-info")
+    driver = webdriver.Chrome(options=chrome_options)
+    driver.set_script_timeout(120)
+    driver.execute_cdp_cmd("Performance.enable", {})
+    return driver
+
+def load_page(driver, url):
+    """Lädt die Seite einmal: Paint-/Navigation-Timing, DOM-Größe und JS-Heap nach Garbage Collection"""
+    driver.get(url)
+    driver.execute_async_script(WAIT_FOR_PAINT_JS)
+    result = {key: value for key, value in driver.execute_script(LOAD_METRICS_JS).items() if value is not None}
+    driver.execute_cdp_cmd("HeapProfiler.collectGarbage", {})
+    metrics = {metric["name"]: metric["value"]
+               for metric in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+    result["dom_nodes"] = int(metrics["Nodes"])
+    result["heap_mb"] = metrics["JSHeapUsedSize"] / 2**20
+    return result
+
+def type_queries(driver, queries):
+    """Tippt jede Suche Zeichen für Zeichen: (Script-Zeiten, Zeiten bis zum nächsten Frame) in ms"""
+    script_times = []
+    frame_times = []
+    for query in queries:
+        for length in range(1, len(query) + 1):
+            script, frame = driver.execute_async_script(KEYSTROKE_JS, query[:length])
+            script_times.append(script)
+            frame_times.append(frame)
+        # Suche leeren, damit die nächste wieder bei der vollen Tabelle beginnt
+        driver.execute_async_script(KEYSTROKE_JS, "")
+    return script_times, frame_times
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def measure_size(driver, mensen, days, directory, repeat, queries, assets):
+    """Rendert einen synthetischen Datensatz und misst ihn im Browser"""
+    all_data = mensa_model.from_json(synthetic_data(mensen, days), mensa_watchlist.DEFAULT_MATCHER)
+    start = time.perf_counter()
+    html = scrape_mensen.generate_html(all_data, assets=assets)
+    render_ms = (time.perf_counter() - start) * 1000
+
+    path = os.path.join(directory, f"page-{mensen}x{days}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    if assets:
+        scrape_mensen.write_assets(scrape_mensen.page_assets("page", external=True)[2],
+                                   os.path.join(directory, mensa_assets.ASSETS_DIR))
+    url = "file://" + os.path.abspath(path)
+
+    loads = [load_page(driver, url) for _ in range(repeat)]
+    result = {
+        "dishes": sum(day.dish_count for dates in all_data.values() for day in dates.values()),
+        "html_kb": len(html.encode("utf-8")) / 1024,
+        "render_ms": render_ms,
+    }
+    for key in loads[0]:
+        values = [load[key] for load in loads if key in load]
+        result[key] = statistics.median(values)
+
+    script_times, frame_times = type_queries(driver, queries)
+    result.update({
+        "keystrokes": len(frame_times),
+        "keystroke_median_ms": statistics.median(frame_times),
+        "keystroke_p95_ms": percentile(frame_times, 0.95),
+        "keystroke_max_ms": max(frame_times),
+        "search_script_median_ms": statistics.median(script_times),
+    })
+    return result
+
+def run_benchmarks(sizes, repeat, queries, assets):
+    results = {}
+    driver = setup_driver()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for mensen, days in sizes:
+                print(f"  ⏳ {mensen} Mensen × {days} Tage...")
+                results[f"{mensen}x{days}"] = measure_size(driver, mensen, days, tmp, repeat, queries, assets)
+    finally:
+        driver.quit()
+    return results
+
+def print_results(results):
+    print(f"  {'Größe':<9} {'Gerichte':>8} {'HTML kB':>9} {'DOM':>8} {'FCP ms':>8} {'Heap MB':>8} "
+          f"{'Taste ms':>9} {'p95 ms':>8}")
+    for size, result in results.items():
+        print(f"  {size:<9} {result['dishes']:>8} {result['html_kb']:>9.1f} {result['dom_nodes']:>8} "
+              f"{result.get('first_contentful_paint_ms', float('nan')):>8.1f} {result['heap_mb']:>8.2f} "
+              f"{result['keystroke_median_ms']:>9.2f} {result['keystroke_p95_ms']:>8.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Bratwurst Frühwarnsystem - Frontend-Benchmark")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Datensätze als MensenxTage, kommagetrennt")
+    parser.add_argument("--repeat", type=int, default=3, help="Seitenaufrufe pro Größe (Median)")
+    parser.add_argument("--queries", default=DEFAULT_QUERIES, help="Suchbegriffe, die Zeichen für Zeichen getippt werden")
+    parser.add_argument("--assets", action="store_true", help="Seite mit ausgelagertem CSS/JS und minifiziertem Markup")
+    parser.add_argument("--output", help="Ergebnisse als JSON speichern")
+    parser.add_argument("--baseline", help="JSON eines früheren Laufs zum Vergleich")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Erlaubte Verschlechterung gegenüber der Baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    sizes = parse_sizes(args.sizes)
+    queries = [query for query in args.queries.split(",") if query]
+    print(f"⏱️  Frontend-Benchmark: {len(sizes)} Größen, {args.repeat} Aufrufe, Suche nach {', '.join(queries)}")
+    results = run_benchmarks(sizes, args.repeat, queries, args.assets)
+    print_results(results)
+
+    if args.output:
+        report = {
+            "meta": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "assets": args.assets,
+                "queries": queries,
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Ergebnisse in {args.output} gespeichert")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"]["assets"] != args.assets or baseline["meta"]["queries"] != queries:
+            print("❌ Baseline wurde mit anderen Einstellungen (--assets/--queries) gemessen - nicht vergleichbar")
+            sys.exit(2)
+        regressions = compare(results, baseline["results"], args.threshold, REGRESSION_METRICS)
+        for stage, metric, old, new in regressions:
+            print(f"❌ Regression {stage} {metric}: {old:.4f} -> {new:.4f}")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ Keine Regression über {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Bratwurst Frühwarnsystem - Offline-Benchmark für Scrape -> Parse -> Render
+Misst Parsen, Transformation und Rendern ohne Chrome und ohne stw.berlin.
+
+Beispiele:
+    python benchmarks/bench_pipeline.py --mensen 30 --days 365 --output bench_results.json
+    python benchmarks/bench_pipeline.py --baseline bench_results.json --threshold 0.2
+"""
+
+from datetime import datetime, timedelta
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mensa_compact  # noqa: E402
+import mensa_model  # noqa: E402
+import mensa_prices  # noqa: E402
+import mensa_watchlist  # noqa: E402
+import scrape_mensen  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Bausteine für synthetische Gerichtnamen
+HAUPTZUTATEN = ["Bratwurst", "Currywurst", "Schnitzel", "Seelachsfilet", "Tofu", "Falafel", "Hähnchenbrust",
+                "Kohlroulade", "Linsen-Dal", "Gemüsebratling", "Käsespätzle", "Germknödel", "Quinoa-Pfanne",
+                "Grünkohl-Bällchen", "Pasta", "Chili sin Carne", "Kartoffelsuppe", "Sellerieschnitzel"]
+BEILAGEN = ["Pommes", "Dampfkartoffeln", "Reis", "Bulgur", "Salat", "Rotkohl", "Kartoffelpüree", "Couscous"]
+SAUCEN = ["Zwiebelsauce", "Currysauce", "Kräutersauce", "Tomaten-Paprika-Sugo", "Honig-Senf-Sauce",
+          "Kokos-Curry-Sauce", "Tahin-Dip", "Pflaumenmus"]
+ZUSAETZE = ["", " (vegan)", " mit frischer Petersilie", " aus dem Wok", " nach Hausrezept"]
+PREISE = ["€ 1,75/3,50/4,05", "€ 1,95/3,90/4,50", "€ 2,65/5,30/6,10", "€ 2,95/3,25/3,55",
+          "€ 2,75/5,50/6,35", "€ 4,95/5,45/5,95", "€ 6,45/7,10/7,75", ""]
+
+def synthetic_data(mensen=30, days=365, seed=0, start="2026-01-05"):
+    """Erzeugt einen Datensatz im mensen_data.json-Format mit 'mensen' Mensen über 'days' Tage
+
+    Wochenenden bleiben leer, pro Tag gibt es 1-3 Aktionen und 4-8 Essen.
+    """
+    rng = random.Random(seed)
+    start_date = datetime.strptime(start, '%Y-%m-%d')
+
+    def gericht():
+        name = f"{rng.choice(HAUPTZUTATEN)} mit {rng.choice(BEILAGEN)} an {rng.choice(SAUCEN)}{rng.choice(ZUSAETZE)}"
+        return {'name': name, 'preis': rng.choice(PREISE)}
+
+    all_data = {}
+    for mensa_index in range(mensen):
+        speiseplan = {}
+        for day_offset in range(days):
+            datum = start_date + timedelta(days=day_offset)
+            if datum.weekday() >= 5:
+                continue
+            speiseplan[datum.strftime('%Y-%m-%d')] = {
+                'Aktionen': [gericht() for _ in range(rng.randint(1, 3))],
+                'Essen': [gericht() for _ in range(rng.randint(4, 8))],
+            }
+        all_data[f"Mensa {mensa_index + 1:02d}"] = speiseplan
+    return all_data
+
+def measure(func, repeat):
+    """Führt 'func' 'repeat'-mal aus: Median der Laufzeit und Peak-Speicher des letzten Laufs"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": statistics.median(timings), "peak_mb": peak / 2**20}
+
+def run_benchmarks(mensen, days, repeat, parse_iterations):
+    results = {}
+
+    # Parse: aufgezeichnete Seiten/Fragmente aus benchmarks/fixtures
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        name = os.path.splitext(os.path.basename(path))[0]
+
+        def parse(html=html):
+            for _ in range(parse_iterations):
+                scrape_mensen.parse_speiseplan(html)
+
+        result = measure(parse, repeat)
+        result["seconds"] /= parse_iterations
+        results[f"parse/{name}"] = result
+
+    # Transform: Datenmodell aufbauen (Klassifizieren, Preise), Aggregate, kompaktes Format
+    data = synthetic_data(mensen, days)
+    matcher = mensa_watchlist.DEFAULT_MATCHER
+    results["transform/enrich"] = measure(lambda: mensa_model.from_json(data, matcher), repeat)
+    enriched = mensa_model.from_json(data, matcher)
+    results["transform/prices"] = measure(lambda: mensa_prices.PriceTable.from_data(enriched).summarize(), repeat)
+    results["transform/compact"] = measure(lambda: mensa_compact.encode(enriched), repeat)
+
+    # Render: komplette Seite in eine Temp-Datei streamen
+    with tempfile.TemporaryDirectory() as tmp:
+        results["render/inline"] = measure(
+            lambda: scrape_mensen.write_html(enriched, os.path.join(tmp, "index.html")), repeat)
+        results["render/split"] = measure(
+            lambda: scrape_mensen.write_split(enriched, os.path.join(tmp, "split.html"), os.path.join(tmp, "data")),
+            repeat)
+
+    return results
+
+def compare(results, baseline, threshold, metrics=("seconds", "peak_mb")):
+    """Liefert alle Messwerte, die mehr als 'threshold' schlechter sind als die Baseline"""
+    regressions = []
+    for stage, result in results.items():
+        if stage not in baseline:
+            continue
+        for metric in metrics:
+            if metric not in baseline[stage] or metric not in result:
+                continue
+            old, new = baseline[stage][metric], result[metric]
+            if old > 0 and new > old * (1 + threshold):
+                regressions.append((stage, metric, old, new))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bratwurst Frühwarnsystem - Offline-Benchmark")
+    parser.add_argument("--mensen", type=int, default=30, help="Anzahl synthetischer Mensen")
+    parser.add_argument("--days", type=int, default=365, help="Anzahl synthetischer Tage")
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen pro Messung (Median)")
+    parser.add_argument("--parse-iterations", type=int, default=50, help="Parse-Aufrufe pro Fixture und Messung")
+    parser.add_argument("--output", help="Ergebnisse als JSON speichern")
+    parser.add_argument("--baseline", help="JSON eines früheren Laufs zum Vergleich")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Erlaubte Verschlechterung gegenüber der Baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    print(f"⏱️  Benchmark: {args.mensen} Mensen × {args.days} Tage, {args.repeat} Wiederholungen")
+    results = run_benchmarks(args.mensen, args.days, args.repeat, args.parse_iterations)
+
+    for stage, result in results.items():
+        print(f"  {stage:<28} {result['seconds'] * 1000:10.2f} ms   {result['peak_mb']:8.2f} MB peak")
+
+    if args.output:
+        report = {
+            "meta": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "html_parser": scrape_mensen.HTML_PARSER,
+                "numpy": mensa_prices.np is not None,
+                "mensen": args.mensen,
+                "days": args.days,
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Ergebnisse in {args.output} gespeichert")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if (baseline["meta"]["mensen"], baseline["meta"]["days"]) != (args.mensen, args.days):
+            print(f"❌ Baseline wurde mit {baseline['meta']['mensen']} Mensen × {baseline['meta']['days']} Tagen "
+                  f"gemessen - nicht vergleichbar")
+            sys.exit(2)
+        regressions = compare(results, baseline["results"], args.threshold)
+        for stage, metric, old, new in regressions:
+            print(f"❌ Regression {stage} {metric}: {old:.4f} -> {new:.4f}")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ Keine Regression über {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
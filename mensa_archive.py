@@ -0,0 +1,163 @@
+"""
+Bratwurst Frühwarnsystem - Historisches Archiv
+Speichert jeden Scrape-Lauf in SQLite und beantwortet Fragen wie
+"Wann gab es zuletzt Bratwurst in der HU Süd?" ohne alte JSON-Dateien zu laden.
+
+Beispiele:
+    python mensa_archive.py last Bratwurst --mensa "HU Süd"
+    python mensa_archive.py preise "Kräuterquark mit Dampfkartoffeln"
+    python mensa_archive.py import mensen_data.json
+"""
+
+from datetime import datetime
+import argparse
+import json
+import sqlite3
+
+import mensa_model
+
+ARCHIVE_FILE = "mensen_archive.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dishes (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    norm TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dishes_norm ON dishes(norm);
+
+CREATE TABLE IF NOT EXISTS servings (
+    mensa TEXT NOT NULL,
+    date TEXT NOT NULL,
+    kategorie TEXT NOT NULL,
+    dish_id INTEGER NOT NULL REFERENCES dishes(id),
+    preis TEXT NOT NULL DEFAULT '',
+    scraped_at TEXT NOT NULL,
+    PRIMARY KEY (mensa, date, kategorie, dish_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_servings_dish ON servings(dish_id, date);
+CREATE INDEX IF NOT EXISTS idx_servings_date ON servings(date, mensa);
+"""
+
+def normalize_dish(name):
+    """Normalisierter Gerichtname: Kleinschreibung, ohne Akzente/Umlaute, einfache Leerzeichen"""
+    return ' '.join(mensa_model.fold_text(name).split())
+
+def connect(path=ARCHIVE_FILE):
+    """Öffnet das Archiv und legt Tabellen und Indizes bei Bedarf an"""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+def dish_id(conn, name, cache):
+    """ID eines Gerichts, legt es beim ersten Auftreten an"""
+    if name not in cache:
+        conn.execute("INSERT OR IGNORE INTO dishes (name, norm) VALUES (?, ?)", (name, normalize_dish(name)))
+        cache[name] = conn.execute("SELECT id FROM dishes WHERE name = ?", (name,)).fetchone()[0]
+    return cache[name]
+
+def archive_data(conn, all_data, scraped_at=None):
+    """Übernimmt einen Lauf ({mensa: {datum: DayPlan}}) ins Archiv - idempotent, mehrfaches Archivieren ändert nichts
+
+    Jeder enthaltene Mensa-Tag ersetzt den bisher archivierten Stand dieses Tages,
+    Tage, die nicht im Lauf enthalten sind, bleiben unverändert.
+    """
+    scraped_at = scraped_at or datetime.now().strftime('%Y-%m-%d')
+    cache = {}
+    rows = 0
+    with conn:
+        for mensa_name, dates in all_data.items():
+            for date_str, day in dates.items():
+                conn.execute("DELETE FROM servings WHERE mensa = ? AND date = ?", (mensa_name, date_str))
+                for kategorie, meals in day.kategorien():
+                    for meal in meals:
+                        conn.execute(
+                            "INSERT OR REPLACE INTO servings (mensa, date, kategorie, dish_id, preis, scraped_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (mensa_name, date_str, kategorie, dish_id(conn, meal.name, cache), meal.preis, scraped_at),
+                        )
+                        rows += 1
+    return rows
+
+def last_served(conn, query, mensa=None, until=None):
+    """Letztes Datum (bis einschließlich 'until', Standard heute), an dem ein passendes Gericht auftauchte"""
+    until = until or datetime.now().strftime('%Y-%m-%d')
+    sql = ("SELECT s.date, s.mensa, d.name, s.preis FROM dishes d JOIN servings s ON s.dish_id = d.id "
+           "WHERE d.norm LIKE ? AND s.date <= ?")
+    params = [f"%{normalize_dish(query)}%", until]
+    if mensa:
+        sql += " AND s.mensa = ?"
+        params.append(mensa)
+    sql += " ORDER BY s.date DESC LIMIT 1"
+    return conn.execute(sql, params).fetchone()
+
+def price_history(conn, query, mensa=None):
+    """Preisverlauf passender Gerichte - nur die Tage, an denen sich der Preis geändert hat"""
+    sql = ("SELECT s.date, s.mensa, d.name, s.preis FROM dishes d JOIN servings s ON s.dish_id = d.id "
+           "WHERE d.norm LIKE ?")
+    params = [f"%{normalize_dish(query)}%"]
+    if mensa:
+        sql += " AND s.mensa = ?"
+        params.append(mensa)
+    sql += " ORDER BY d.name, s.mensa, s.date"
+
+    history = []
+    last_price = {}
+    for date_str, mensa_name, name, preis in conn.execute(sql, params):
+        if last_price.get((mensa_name, name)) != preis:
+            last_price[(mensa_name, name)] = preis
+            history.append((date_str, mensa_name, name, preis))
+    return history
+
+def served_weekdays(conn, mensa, min_weeks=8):
+    """Wochentage (0 = Montag), an denen die Mensa laut Archiv Gerichte hatte
+    
+    None, solange das Archiv weniger als 'min_weeks' Wochen dieser Mensa abdeckt.
+    """
+    dates = [datetime.strptime(row[0], '%Y-%m-%d').date()
+             for row in conn.execute("SELECT DISTINCT date FROM servings WHERE mensa = ?", (mensa,))]
+    if not dates or (max(dates) - min(dates)).days < min_weeks * 7:
+        return None
+    return {day.weekday() for day in dates}
+
+def main():
+    parser = argparse.ArgumentParser(description="Bratwurst Frühwarnsystem - Archiv-Abfragen")
+    parser.add_argument("--db", default=ARCHIVE_FILE, help="Pfad zur Archiv-Datenbank")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    last_parser = subparsers.add_parser("last", help="Wann gab es ein Gericht zuletzt?")
+    last_parser.add_argument("gericht")
+    last_parser.add_argument("--mensa")
+
+    preise_parser = subparsers.add_parser("preise", help="Preisverlauf eines Gerichts")
+    preise_parser.add_argument("gericht")
+    preise_parser.add_argument("--mensa")
+
+    import_parser = subparsers.add_parser("import", help="mensen_data.json ins Archiv übernehmen")
+    import_parser.add_argument("datei")
+
+    args = parser.parse_args()
+    conn = connect(args.db)
+
+    if args.command == "last":
+        row = last_served(conn, args.gericht, args.mensa)
+        if row:
+            date_str, mensa_name, name, preis = row
+            print(f"🌭 {datetime.strptime(date_str, '%Y-%m-%d').strftime('%d.%m.%Y')} in {mensa_name}: {name} {preis}".rstrip())
+        else:
+            print(f"😕 '{args.gericht}' nicht im Archiv gefunden")
+    elif args.command == "preise":
+        history = price_history(conn, args.gericht, args.mensa)
+        for date_str, mensa_name, name, preis in history:
+            print(f"{date_str}  {mensa_name:<22} {preis or '-':<20} {name}")
+        if not history:
+            print(f"😕 '{args.gericht}' nicht im Archiv gefunden")
+    elif args.command == "import":
+        with open(args.datei, encoding="utf-8") as f:
+            rows = archive_data(conn, mensa_model.days_from_json(json.load(f)))
+        print(f"✅ {rows} Gerichte archiviert")
+
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Bratwurst Frühwarnsystem - Statische Assets
+CSS und JS der Seite landen minifiziert in Dateien mit Inhalts-Hash im Namen (unbegrenzt
+cachebar, der Name ändert sich nur mit dem Inhalt), das Markup wird ohne Einrückung
+ausgegeben, und jedes Artefakt bekommt vorkomprimierte .gz- und .br-Geschwister.
+
+Brotli ist optional - ohne das Paket 'brotli' gibt es nur .gz.
+"""
+
+import gzip
+import hashlib
+import re
+
+# Brotli komprimiert HTML/JSON deutlich besser als gzip, ist aber optional
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ASSETS_DIR = "assets"
+# Für Dateien mit Inhalts-Hash im Namen - ändert sich der Inhalt, ändert sich die URL
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# (Content-Encoding, Dateiendung), bevorzugte Kodierung zuerst
+ENCODINGS = (("br", ".br"), ("gzip", ".gz")) if brotli else (("gzip", ".gz"),)
+COMPRESSED_SUFFIXES = (".br", ".gz")
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+CSS_SPACE_RE = re.compile(r'\s+')
+CSS_PUNCT_RE = re.compile(r'\s*([{};,])\s*')
+MARKUP_LINE_RE = re.compile(r'\s*\n\s*')
+MARKUP_GAP_RE = re.compile(r'>\s+<')
+
+def content_hash(data):
+    return hashlib.sha1(data).hexdigest()[:12]
+
+def hashed_name(stem, extension, data):
+    """'style', 'css', b'...' -> 'style.3f2a9c0d1e7b.css'"""
+    return f"{stem}.{content_hash(data)}.{extension}"
+
+def uncompressed_name(file_name):
+    """'week-2026-W07.json.br' -> 'week-2026-W07.json'"""
+    for suffix in COMPRESSED_SUFFIXES:
+        if file_name.endswith(suffix):
+            return file_name[:-len(suffix)]
+    return file_name
+
+def minify_css(css):
+    """Kommentare und überflüssige Leerzeichen entfernen - Selektoren bleiben unangetastet"""
+    css = CSS_SPACE_RE.sub(' ', CSS_COMMENT_RE.sub('', css))
+    return CSS_PUNCT_RE.sub(r'\1', css).replace(';}', '}').strip()
+
+def minify_js(js):
+    """Konservativ: Einrückung, Leerzeilen und reine Kommentarzeilen entfernen
+
+    Zeilenumbrüche bleiben, damit die automatische Semikolon-Einfügung nicht anders greift.
+    """
+    lines = (line.strip() for line in js.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//')) + '\n'
+
+def minify_markup(chunks):
+    """Entfernt Einrückung und Zeilenumbrüche aus dem Markup, Chunk für Chunk
+
+    Zeilenumbrüche innerhalb eines Chunks werden zu einem Leerzeichen, zwischen Tags
+    verschwinden sie ganz. Inline-CSS/JS darf in den Chunks nicht vorkommen.
+    """
+    for chunk in chunks:
+        yield MARKUP_GAP_RE.sub('><', MARKUP_LINE_RE.sub(' ', chunk.strip()))
+
+def compressed(data):
+    """Alle vorkomprimierten Varianten: [(Content-Encoding, Dateiendung, Bytes)]"""
+    variants = []
+    for encoding, suffix in ENCODINGS:
+        if encoding == "br":
+            body = brotli.compress(data, quality=11)
+        else:
+            # Ohne Zeitstempel, damit gleiche Eingaben gleiche Dateien ergeben
+            body = gzip.compress(data, compresslevel=9, mtime=0)
+        variants.append((encoding, suffix, body))
+    return variants
+
+def accepted_encoding(header):
+    """Beste vorkomprimierte Kodierung laut Accept-Encoding (None = unkomprimiert)"""
+    accepted = set()
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    for encoding, _ in ENCODINGS:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
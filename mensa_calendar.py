@@ -0,0 +1,113 @@
+"""
+Bratwurst Frühwarnsystem - Kalender
+Entscheidet vor dem Scrapen, an welchen Tagen eine Mensa überhaupt geöffnet haben kann:
+Wochenenden, Berliner Feiertage und Wochentage, an denen laut Archiv nie etwas serviert
+wurde, werden übersprungen. In der ersten Woche entscheidet die Tagesnavigation der
+Seite selbst, welche Tage es gibt.
+"""
+
+from datetime import date, datetime, timedelta
+import re
+
+# Tage, die die Navigation der Mensa-Seite abdeckt - hier gelten keine statischen Regeln
+NAV_DAYS = 7
+# Standard-Öffnungstage (0 = Montag), in der Registry per "weekdays" überschreibbar
+OPEN_WEEKDAYS = (0, 1, 2, 3, 4)
+# So viele Wochen Archiv braucht es, bevor ein Wochentag als "immer geschlossen" gilt
+MIN_ARCHIVE_WEEKS = 8
+
+NAV_DATE_RE = re.compile(r"loadSpeiseplanWochentag\('(\d{4}-\d{2}-\d{2})'\)")
+# onclick/href aller Elemente, die loadSpeiseplanWochentag() aufrufen
+NAV_DATES_JS = """
+return Array.from(document.querySelectorAll('[onclick*="loadSpeiseplanWochentag"], [href*="loadSpeiseplanWochentag"]'),
+    function(e) { return (e.getAttribute('onclick') || '') + ' ' + (e.getAttribute('href') || ''); }).join(' ');
+"""
+
+WEEKDAY_NAMES = ['Montag', 'Dienstag', 'Mittwoch', 'Donnerstag', 'Freitag', 'Samstag', 'Sonntag']
+
+def easter_sunday(year):
+    """Ostersonntag nach der Gaußschen Osterformel (gregorianisch, anonymer Algorithmus)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+def berlin_holidays(year):
+    """Gesetzliche Feiertage in Berlin: {datum: name}"""
+    easter = easter_sunday(year)
+    return {
+        date(year, 1, 1): "Neujahr",
+        date(year, 3, 8): "Internationaler Frauentag",
+        easter - timedelta(days=2): "Karfreitag",
+        easter + timedelta(days=1): "Ostermontag",
+        date(year, 5, 1): "Tag der Arbeit",
+        easter + timedelta(days=39): "Christi Himmelfahrt",
+        easter + timedelta(days=50): "Pfingstmontag",
+        date(year, 10, 3): "Tag der Deutschen Einheit",
+        date(year, 12, 25): "1. Weihnachtstag",
+        date(year, 12, 26): "2. Weihnachtstag",
+    }
+
+def plan_days(dates, open_weekdays=OPEN_WEEKDAYS, nav_days=NAV_DAYS):
+    """Teilt 'dates' in (zu scrapen, übersprungen {datum: grund}) auf
+
+    Die ersten 'nav_days' Tage bleiben immer drin - dort filtert später filter_by_navigation().
+    """
+    holidays = {}
+    to_scrape = []
+    skipped = {}
+    for day_offset, date_str in enumerate(dates):
+        day = datetime.strptime(date_str, '%Y-%m-%d').date()
+        if day_offset < nav_days:
+            to_scrape.append(date_str)
+            continue
+        if day.year not in holidays:
+            holidays[day.year] = berlin_holidays(day.year)
+        if day in holidays[day.year]:
+            skipped[date_str] = holidays[day.year][day]
+        elif day.weekday() not in open_weekdays:
+            skipped[date_str] = f"geschlossen ({WEEKDAY_NAMES[day.weekday()]})"
+        else:
+            to_scrape.append(date_str)
+    return to_scrape, skipped
+
+def navigation_dates(text):
+    """Alle Tage, die die Seite in ihrer Tagesnavigation anbietet"""
+    return set(NAV_DATE_RE.findall(text or ""))
+
+def filter_by_navigation(dates, nav_dates):
+    """Entfernt Tage bis zum letzten Navigationseintrag, die die Navigation nicht anbietet
+
+    Gibt (zu scrapen, übersprungen {datum: grund}) zurück. Ohne Navigation bleibt alles drin,
+    Tage nach dem letzten Navigationseintrag ebenso.
+    """
+    if not nav_dates:
+        return list(dates), {}
+    last = max(nav_dates)
+    to_scrape = []
+    skipped = {}
+    for date_str in dates:
+        if date_str <= last and date_str not in nav_dates:
+            skipped[date_str] = "nicht in der Tagesnavigation"
+        else:
+            to_scrape.append(date_str)
+    return to_scrape, skipped
+
+def open_weekdays(configured=None, served_weekdays=None):
+    """Öffnungstage einer Mensa: aus der Registry, sonst die laut Archiv geöffneten Wochentage
+
+    'served_weekdays' kommt aus mensa_archive.served_weekdays(), bei zu wenig Archiv (None)
+    gilt OPEN_WEEKDAYS.
+    """
+    if configured is not None:
+        return tuple(configured)
+    if served_weekdays is None:
+        return OPEN_WEEKDAYS
+    return tuple(sorted(served_weekdays))
@@ -0,0 +1,114 @@
+"""
+Bratwurst Frühwarnsystem - Änderungserkennung
+Fingerprint über den normalisierten Datensatz (nur Name und Preis jedes Gerichts) und
+ein strukturierter Diff zum letzten Lauf: neue, entfallene und geänderte Gerichte pro
+Mensa und Tag. Hat sich nichts geändert, muss weder gerendert noch deployt werden.
+"""
+
+from datetime import datetime
+import hashlib
+import json
+import os
+
+CHANGES_FILE = "mensen_changes.json"
+
+def day_hash(day):
+    """Inhalts-Hash eines Tages (None für Tage ohne Gerichte)
+
+    Gehasht wird nur Name und Preis, damit sich der Hash mit der Watchlist nicht ändert.
+    """
+    if day is None:
+        return None
+    payload = json.dumps(day.to_json(enriched=False), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def fingerprint(all_data):
+    """Fingerprint eines Datensatzes {mensa: {datum: DayPlan}} - unabhängig von der Reihenfolge der Tage"""
+    digest = hashlib.sha1()
+    for mensa_name in sorted(all_data):
+        dates = all_data[mensa_name]
+        digest.update(f"{mensa_name}\n".encode("utf-8"))
+        for date_str in sorted(dates):
+            digest.update(f"{date_str}\t{day_hash(dates[date_str])}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def meals_by_name(day):
+    """{name: (kategorie, preis)} eines Tages - bei doppelten Namen zählt das erste Vorkommen"""
+    meals = {}
+    if day is not None:
+        for kategorie, day_meals in day.kategorien():
+            for meal in day_meals:
+                meals.setdefault(meal.name, (kategorie, meal.preis))
+    return meals
+
+def diff_day(old_day, new_day):
+    """Unterschiede eines Tages: {'added': [...], 'removed': [...], 'changed': [...]}, leer wenn gleich"""
+    old_meals = meals_by_name(old_day)
+    new_meals = meals_by_name(new_day)
+    diff = {}
+    added = [{"name": name, "kategorie": kategorie, "preis": preis}
+             for name, (kategorie, preis) in new_meals.items() if name not in old_meals]
+    removed = [{"name": name, "kategorie": kategorie, "preis": preis}
+               for name, (kategorie, preis) in old_meals.items() if name not in new_meals]
+    changed = []
+    for name, (kategorie, preis) in new_meals.items():
+        old = old_meals.get(name)
+        if old is not None and old != (kategorie, preis):
+            change = {"name": name}
+            if old[0] != kategorie:
+                change["kategorie"] = [old[0], kategorie]
+            if old[1] != preis:
+                change["preis"] = [old[1], preis]
+            changed.append(change)
+    for key, entries in (("added", added), ("removed", removed), ("changed", changed)):
+        if entries:
+            diff[key] = entries
+    return diff
+
+def diff_data(old_data, new_data):
+    """Strukturierter Diff zweier Datensätze: {mensa: {datum: diff_day()}} - nur geänderte Tage"""
+    changes = {}
+    for mensa_name in sorted(old_data.keys() | new_data.keys()):
+        old_dates = old_data.get(mensa_name, {})
+        new_dates = new_data.get(mensa_name, {})
+        for date_str in sorted(old_dates.keys() | new_dates.keys()):
+            old_day, new_day = old_dates.get(date_str), new_dates.get(date_str)
+            if day_hash(old_day) == day_hash(new_day):
+                continue
+            day_diff = diff_day(old_day, new_day)
+            if day_diff:
+                changes.setdefault(mensa_name, {})[date_str] = day_diff
+    return changes
+
+def change_report(old_data, new_data):
+    """Fingerprints beider Stände plus Diff, als Change-Feed (mensen_changes.json)"""
+    previous, current = fingerprint(old_data), fingerprint(new_data)
+    return {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "previous": previous,
+        "fingerprint": current,
+        "changed": previous != current,
+        "mensen": diff_data(old_data, new_data) if previous != current else {},
+    }
+
+def print_changes(report):
+    """Eine Zeile pro geändertem Mensa-Tag: +neu -entfallen ~geändert"""
+    if not report["changed"]:
+        print("✅ Keine Änderungen gegenüber dem letzten Lauf")
+        return
+    days = sum(len(dates) for dates in report["mensen"].values())
+    print(f"🔄 {days} Mensa-Tage geändert")
+    for mensa_name, dates in report["mensen"].items():
+        for date_str, day_diff in dates.items():
+            counts = " ".join(f"{sign}{len(day_diff[key])}" for sign, key in
+                              (("+", "added"), ("-", "removed"), ("~", "changed")) if key in day_diff)
+            print(f"  {mensa_name} {date_str}: {counts}")
+
+def write_github_output(**values):
+    """Gibt Werte als Step-Outputs an GitHub Actions weiter (nur wenn GITHUB_OUTPUT gesetzt ist)"""
+    path = os.environ.get("GITHUB_OUTPUT")
+    if not path:
+        return
+    with open(path, "a", encoding="utf-8") as f:
+        for key, value in values.items():
+            f.write(f"{key}={value}\n")
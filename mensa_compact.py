@@ -0,0 +1,61 @@
+"""
+Bratwurst Frühwarnsystem - Kompaktes Datensatz-Format
+Gerichtnamen und Preise stehen genau einmal in einer String-Tabelle, Tage verweisen nur noch
+auf Gericht-IDs. Deutlich kleiner als mensen_data.json und schneller geladen;
+scrape_mensen.load_data() erkennt beide Formate.
+"""
+
+from mensa_model import DayPlan, Meal
+
+COMPACT_FORMAT = "bratwurst-compact"
+COMPACT_VERSION = 1
+COMPACT_FILE = "mensen_data.compact.json"
+
+def is_compact(data):
+    return data.get("format") == COMPACT_FORMAT
+
+def encode(all_data):
+    """Datensatz -> kompaktes Format
+
+    {"format": ..., "strings": [...], "dishes": [[name_id, preis_id], ...],
+     "mensen": {mensa: {datum: [[Aktionen-IDs], [Essen-IDs]]}}}
+    """
+    strings = {}
+    dishes = {}
+
+    def intern(text):
+        return strings.setdefault(text, len(strings))
+
+    mensen = {}
+    for mensa_name, dates in all_data.items():
+        mensa_days = {}
+        for date_str, day_plan in dates.items():
+            day = []
+            for _, meals in day_plan.kategorien():
+                ids = []
+                for meal in meals:
+                    key = (intern(meal.name), intern(meal.preis))
+                    ids.append(dishes.setdefault(key, len(dishes)))
+                day.append(ids)
+            mensa_days[date_str] = day
+        mensen[mensa_name] = mensa_days
+
+    return {
+        "format": COMPACT_FORMAT,
+        "version": COMPACT_VERSION,
+        "strings": list(strings),
+        "dishes": [list(key) for key in dishes],
+        "mensen": mensen,
+    }
+
+def decode(payload):
+    """Wandelt das kompakte Format zurück in {mensa: {datum: DayPlan}} - ein Meal pro Gericht-ID"""
+    strings = payload["strings"]
+    dishes = [Meal(strings[name_id], strings[preis_id]) for name_id, preis_id in payload["dishes"]]
+    return {
+        mensa_name: {
+            date_str: DayPlan(*([dishes[dish_id] for dish_id in ids] for ids in day))
+            for date_str, day in dates.items()
+        }
+        for mensa_name, dates in payload["mensen"].items()
+    }
@@ -0,0 +1,368 @@
+"""
+Bratwurst Frühwarnsystem - Dauerbetrieb
+Hält Chrome bzw. HTTP-Sessions warm, aktualisiert jede Mensa in ihrem eigenen Takt und
+liefert Datensatz und fertige Seite über einen kleinen lokalen HTTP-Server aus.
+Clients pollen mit If-None-Match und bekommen 304, solange sich nichts geändert hat.
+CSS/JS liegen unter /assets/ mit Inhalts-Hash im Namen und dürfen unbegrenzt gecacht
+werden, alle Antworten gibt es vorkomprimiert als gzip bzw. brotli.
+
+Beispiele:
+    python mensa_daemon.py --port 8080
+    python mensa_daemon.py --backend chrome --workers 2 --refresh 30
+    curl -H 'If-None-Match: "<etag>"' http://127.0.0.1:8080/mensen_data.json
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import argparse
+import hashlib
+import heapq
+import json
+import threading
+import time
+
+import mensa_assets
+import mensa_calendar
+import mensa_changes
+import mensa_model
+import mensa_watchlist
+import scrape_mensen
+from mensa_metrics import METRICS
+
+# Standard-Takt pro Mensa, in der Registry per "refresh_minutes" überschreibbar
+REFRESH_MINUTES = 60
+# Nach einem komplett fehlgeschlagenen Lauf früher wieder versuchen
+RETRY_MINUTES = 5
+HOST = "127.0.0.1"
+PORT = 8080
+# Metriken laufen über alle Aktualisierungen weiter - nur die jüngsten Spannen behalten
+MAX_SPANS = 10000
+ASSET_TYPES = {"css": "text/css; charset=utf-8", "js": "text/javascript; charset=utf-8"}
+
+class Snapshot:
+    """Aktueller Datensatz plus vorgerenderte Antworten mit ETags"""
+
+    def __init__(self, all_data, state):
+        self.lock = threading.Lock()
+        self.render_lock = threading.Lock()
+        self.all_data = all_data
+        self.state = state
+        self.fingerprint = None
+        self.responses = {}
+        self.status = {}
+
+    def update(self, mensa_name, speiseplan, mensa_state, matcher):
+        """Übernimmt eine Mensa und rendert neu - aber nur, wenn sich der Inhalt geändert hat"""
+        with self.lock:
+            self.all_data[mensa_name] = speiseplan
+            self.state[mensa_name] = mensa_state
+        return self.render(matcher)
+
+    def render(self, matcher, persist=True):
+        """Rendert und veröffentlicht den aktuellen Stand
+
+        Komplett unter render_lock: mehrere Worker dürfen sich nicht überholen, sonst ersetzt
+        ein älterer Stand einen neueren oder die Dateien stammen aus verschiedenen Durchläufen.
+        """
+        with self.render_lock:
+            with self.lock:
+                all_data = {name: self.all_data[name] for name in sorted(self.all_data)}
+                state = {name: dict(days) for name, days in self.state.items()}
+
+            # Gleicher Fingerprint wie im Scrape-Lauf - ohne Änderung entfällt auch das Anreichern
+            fingerprint = mensa_changes.fingerprint(all_data)
+            if fingerprint == self.fingerprint:
+                return False
+
+            with METRICS.span("enrich"):
+                all_data = scrape_mensen.enrich_data(all_data, matcher)
+                data_json = mensa_model.to_json(all_data)
+            # CSS/JS als gehashte, unbegrenzt cachebare Dateien - täglich neu geladen wird nur die Seite selbst
+            page = scrape_mensen.generate_html(all_data, assets=True).encode("utf-8")
+            data = json.dumps(data_json, ensure_ascii=False, indent=2).encode("utf-8")
+            _, _, asset_files = scrape_mensen.page_assets("page", external=True)
+            with METRICS.span("compress"):
+                responses = {
+                    "/index.html": make_response("text/html; charset=utf-8", page),
+                    "/mensen_data.json": make_response("application/json; charset=utf-8", data),
+                }
+                for file_name, body in asset_files.items():
+                    responses[f"/{mensa_assets.ASSETS_DIR}/{file_name}"] = make_response(
+                        ASSET_TYPES[file_name.rsplit(".", 1)[1]], body, mensa_assets.IMMUTABLE_CACHE_CONTROL)
+            responses["/"] = responses["/index.html"]
+            with self.lock:
+                self.fingerprint = fingerprint
+                self.responses = responses
+
+            if not persist:
+                return True
+            # Auch auf Platte, damit ein Neustart mit dem letzten Stand weitermacht
+            scrape_mensen.write_assets(asset_files)
+            scrape_mensen.write_atomic("index.html", [page], binary=True)
+            scrape_mensen.write_atomic(scrape_mensen.DATA_FILE, [data], binary=True)
+            scrape_mensen.write_json(scrape_mensen.STATE_FILE, state)
+            return True
+
+    def response(self, path):
+        with self.lock:
+            return self.responses.get(path)
+
+    def set_status(self, mensa_name, **values):
+        with self.lock:
+            self.status.setdefault(mensa_name, {}).update(values)
+
+    def status_json(self):
+        with self.lock:
+            return json.dumps({"fingerprint": self.fingerprint, "mensen": self.status},
+                              ensure_ascii=False, indent=2).encode("utf-8")
+
+def etag(body):
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+def make_response(content_type, body, cache_control="no-cache"):
+    """(Content-Type, Body, ETag, Cache-Control, {Content-Encoding: (Body, ETag)}) mit vorkomprimierten Varianten"""
+    tag = etag(body)
+    variants = {encoding: (compressed, f'{tag[:-1]}-{encoding}"')
+                for encoding, _, compressed in mensa_assets.compressed(body)}
+    return content_type, body, tag, cache_control, variants
+
+def etag_matches(header, current):
+    """If-None-Match kann mehrere, auch schwache (W/) ETags oder * enthalten"""
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == current for candidate in candidates)
+
+def make_handler(snapshot):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_body(self, status, content_type, body, tag=None, head=False, cache_control="no-cache",
+                      encoding=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", cache_control)
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            if tag:
+                self.send_header("ETag", tag)
+                self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+
+        def serve(self, head=False):
+            path = self.path.split("?", 1)[0]
+            if path == "/status":
+                self.send_body(200, "application/json; charset=utf-8", snapshot.status_json(), head=head)
+                return
+            response = snapshot.response(path)
+            if response is None:
+                body = b"noch keine Daten" if path in ("/", "/index.html", "/mensen_data.json") else b"nicht gefunden"
+                self.send_body(503 if body.startswith(b"noch") else 404, "text/plain; charset=utf-8", body, head=head)
+                return
+            content_type, body, tag, cache_control, variants = response
+            encoding = mensa_assets.accepted_encoding(self.headers.get("Accept-Encoding"))
+            if encoding in variants:
+                body, tag = variants[encoding]
+            else:
+                encoding = None
+            if etag_matches(self.headers.get("If-None-Match"), tag):
+                self.send_response(304)
+                self.send_header("ETag", tag)
+                self.send_header("Cache-Control", cache_control)
+                self.send_header("Vary", "Accept-Encoding")
+                self.end_headers()
+                return
+            self.send_body(200, content_type, body, tag, head=head, cache_control=cache_control, encoding=encoding)
+
+        def do_GET(self):
+            self.serve()
+
+        def do_HEAD(self):
+            self.serve(head=True)
+
+    return Handler
+
+class Daemon:
+    """Plant die Aktualisierungen pro Mensa und verteilt sie auf Worker mit warmen Browsern"""
+
+    def __init__(self, registry, args, snapshot, matcher, rate, blocked_urls):
+        self.entries = {entry["name"]: entry for entry in registry}
+        self.args = args
+        self.snapshot = snapshot
+        self.matcher = matcher
+        self.stop = threading.Event()
+        self.condition = threading.Condition()
+        self.queue = []
+        self.local = threading.local()
+        self.resources = []
+        self.resources_lock = threading.Lock()
+        self.limiter = scrape_mensen.RateLimiter(rate)
+        self.blocked_urls = blocked_urls
+        METRICS.keep_last(MAX_SPANS)
+
+    def schedule(self, mensa_name, delay):
+        with self.condition:
+            heapq.heappush(self.queue, (time.monotonic() + delay, mensa_name))
+            self.condition.notify()
+
+    def interval(self, mensa_name):
+        minutes = self.args.refresh or self.entries[mensa_name].get("refresh_minutes", REFRESH_MINUTES)
+        return minutes * 60
+
+    def get_driver(self):
+        # Einmal pro Worker starten und über alle Aktualisierungen hinweg behalten
+        driver = getattr(self.local, "driver", None)
+        if driver is not None:
+            try:
+                driver.current_url
+                return driver
+            except Exception:
+                print("⚠️  Chrome reagiert nicht mehr, starte neu")
+                with self.resources_lock:
+                    self.resources.remove(driver)
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+        self.local.driver = scrape_mensen.setup_driver(self.blocked_urls)
+        with self.resources_lock:
+            self.resources.append(self.local.driver)
+        return self.local.driver
+
+    def get_session(self):
+        if getattr(self.local, "session", None) is None:
+            self.local.session = scrape_mensen.setup_session()
+            with self.resources_lock:
+                self.resources.append(self.local.session)
+        return self.local.session
+
+    def refresh(self, mensa_name):
+        """Scrapt eine Mensa inkrementell und plant den nächsten Lauf ein"""
+        entry = self.entries[mensa_name]
+        horizon, _ = mensa_calendar.plan_days(scrape_mensen.day_range(self.args.days or entry["days"]),
+                                              mensa_calendar.open_weekdays(entry.get("weekdays")))
+        with self.snapshot.lock:
+            previous = {mensa_name: self.snapshot.all_data.get(mensa_name, {})}
+            state = {mensa_name: self.snapshot.state.get(mensa_name, {})}
+        planned = scrape_mensen.plan_incremental(mensa_name, horizon, state)
+        failed = []
+        delay = self.interval(mensa_name)
+        try:
+            with METRICS.span("scrape", mensa_name):
+                speiseplan = None
+                if self.args.backend == "http":
+                    speiseplan = scrape_mensen.scrape_mensa_http(self.get_session(), entry["url"], mensa_name,
+                                                                 dates=planned, failed=failed, limiter=self.limiter)
+                if speiseplan is None:
+                    speiseplan = scrape_mensen.scrape_mensa(self.get_driver(), entry["url"], mensa_name,
+                                                            dates=planned, failed=failed, limiter=self.limiter)
+            all_data, new_state = scrape_mensen.merge_incremental(
+                {mensa_name: horizon}, {mensa_name: planned}, {mensa_name: speiseplan},
+                {mensa_name: failed}, previous, state)
+            changed = self.snapshot.update(mensa_name, all_data[mensa_name], new_state[mensa_name], self.matcher)
+            if planned and len(failed) == len(planned):
+                delay = RETRY_MINUTES * 60
+            print(f"{'🔄' if changed else '✅'} {mensa_name}: {len(planned) - len(failed)}/{len(planned)} Tage, "
+                  f"{'neu gerendert' if changed else 'unverändert'}")
+        except Exception as e:
+            print(f"❌ {mensa_name} fehlgeschlagen: {e}")
+            delay = RETRY_MINUTES * 60
+        finally:
+            self.snapshot.set_status(mensa_name, refreshed=datetime.now().isoformat(timespec="seconds"),
+                                     failed=len(failed), next_in_s=round(delay))
+            if not self.stop.is_set():
+                self.schedule(mensa_name, delay)
+
+    def run(self):
+        """Verteilt fällige Mensen, bis stop gesetzt wird"""
+        # Alle Mensen gleich zu Beginn einmal, höchste Priorität zuerst
+        for mensa_name in sorted(self.entries, key=lambda name: -self.entries[name]["priority"]):
+            self.schedule(mensa_name, 0)
+
+        executor = ThreadPoolExecutor(max_workers=self.args.workers, thread_name_prefix="mensa")
+        try:
+            while not self.stop.is_set():
+                with self.condition:
+                    if not self.queue:
+                        self.condition.wait(1)
+                        continue
+                    due, mensa_name = self.queue[0]
+                    wait = due - time.monotonic()
+                    if wait > 0:
+                        self.condition.wait(min(wait, 1))
+                        continue
+                    heapq.heappop(self.queue)
+                executor.submit(self.refresh, mensa_name)
+        finally:
+            # Laufende Aktualisierungen noch fertig machen, aber nichts Neues mehr einplanen
+            self.stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def close(self):
+        with self.resources_lock:
+            for resource in self.resources:
+                try:
+                    resource.quit() if hasattr(resource, "quit") else resource.close()
+                except Exception:
+                    pass
+            self.resources = []
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bratwurst Frühwarnsystem - Dauerbetrieb mit lokalem Server")
+    parser.add_argument("--host", default=HOST, help="Adresse des HTTP-Servers")
+    parser.add_argument("--port", type=int, default=PORT, help="Port des HTTP-Servers")
+    parser.add_argument("--config", default=scrape_mensen.MENSEN_FILE, help="Mensa-Registry (JSON)")
+    parser.add_argument("--backend", choices=["http", "chrome"], default="http",
+                        help="http: direkte XHR-Requests (Chrome nur als Fallback), chrome: immer Selenium")
+    parser.add_argument("--workers", type=int, default=2, help="Gleichzeitig aktualisierte Mensen (warme Browser)")
+    parser.add_argument("--refresh", type=float,
+                        help=f"Minuten zwischen zwei Aktualisierungen einer Mensa "
+                             f"(Standard: refresh_minutes der Registry bzw. {REFRESH_MINUTES})")
+    parser.add_argument("--days", type=int, help="Anzahl Tage ab heute für alle Mensen (Standard: Horizont je Mensa)")
+    parser.add_argument("--rps", type=float,
+                        help=f"Maximale Requests pro Sekunde über alle Worker, 0 = unbegrenzt "
+                             f"(Standard: requests_per_second der Registry bzw. {scrape_mensen.REQUESTS_PER_SECOND:g})")
+    parser.add_argument("--no-block", action="store_true", help="Chrome lädt alle Ressourcen (kein Request-Filter)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    registry, config = scrape_mensen.load_registry(args.config)
+    registry = [entry for entry in registry if entry["enabled"]]
+    rate = args.rps if args.rps is not None else config.get("requests_per_second", scrape_mensen.REQUESTS_PER_SECOND)
+    blocked_urls = [] if args.no_block else scrape_mensen.blocked_url_patterns(
+        config.get("request_filter", scrape_mensen.REQUEST_FILTER))
+
+    # Mit dem Stand des letzten Laufs starten, damit der Server sofort etwas ausliefert
+    previous = scrape_mensen.load_data(scrape_mensen.DATA_FILE, {})
+    state = scrape_mensen.load_json(scrape_mensen.STATE_FILE, {})
+    names = {entry["name"] for entry in registry}
+    snapshot = Snapshot({name: days for name, days in previous.items() if name in names},
+                        {name: days for name, days in state.items() if name in names})
+    daemon = Daemon(registry, args, snapshot, mensa_watchlist.DEFAULT_MATCHER, rate, blocked_urls)
+    if snapshot.all_data:
+        snapshot.render(daemon.matcher, persist=False)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(snapshot))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="http", daemon=True).start()
+    print(f"🌭 Bratwurst Frühwarnsystem läuft auf http://{args.host}:{server.server_port}/ "
+          f"({len(registry)} Mensen, {args.workers} Worker)")
+
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        print("\n🛑 Beendet")
+    finally:
+        server.shutdown()
+        daemon.close()
+
+if __name__ == "__main__":
+    main()
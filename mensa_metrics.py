@@ -0,0 +1,133 @@
+"""
+Bratwurst Frühwarnsystem - Laufzeit-Metriken
+Misst Phasen eines Scrape-Laufs (Chrome-Start, Seitenaufrufe, Tageswechsel, Parsen,
+Rendern, Schreiben) und zählt pro Mensa Retries, leere Tage und Fehler.
+
+Export als JSON-Zusammenfassung oder als Trace im Chrome-Trace-Event-Format
+(ansehen mit chrome://tracing oder https://ui.perfetto.dev).
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import os
+import statistics
+import threading
+import time
+
+class Metrics:
+    """Sammelt Zeitspannen und Zähler threadsicher über einen kompletten Lauf"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = datetime.now()
+        self.origin = time.perf_counter()
+        self.spans = deque()
+        self.counters = {}
+        self.threads = {}
+
+    @contextmanager
+    def span(self, name, mensa=None, **args):
+        """Misst die Dauer des with-Blocks - auch wenn er mit einer Exception endet"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            thread = threading.current_thread()
+            with self.lock:
+                self.threads.setdefault(thread.ident, thread.name)
+                self.spans.append((name, mensa, start - self.origin, end - start, thread.ident, args))
+
+    def keep_last(self, max_spans):
+        """Für Dauerläufe: nur die letzten 'max_spans' Spannen behalten, ältere fallen heraus"""
+        with self.lock:
+            self.spans = deque(self.spans, maxlen=max_spans)
+
+    def count(self, mensa, counter, n=1):
+        """Erhöht einen Zähler einer Mensa (z.B. 'retries', 'empty_days', 'failures')"""
+        with self.lock:
+            mensa_counters = self.counters.setdefault(mensa, {})
+            mensa_counters[counter] = mensa_counters.get(counter, 0) + n
+
+    def summary(self):
+        """Zusammenfassung pro Phase (gesamt und pro Mensa) plus Zähler"""
+        phases = {}
+        mensen = {}
+        with self.lock:
+            spans = list(self.spans)
+            counters = {mensa: dict(values) for mensa, values in self.counters.items()}
+
+        for name, mensa, _, duration, _, _ in spans:
+            phases.setdefault(name, []).append(duration)
+            if mensa is not None:
+                mensen.setdefault(mensa, {}).setdefault(name, []).append(duration)
+
+        def describe(durations):
+            return {
+                "count": len(durations),
+                "total": round(sum(durations), 4),
+                "median": round(statistics.median(durations), 4),
+                "max": round(max(durations), 4),
+            }
+
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "total_seconds": round(time.perf_counter() - self.origin, 3),
+            "phases": {name: describe(durations) for name, durations in phases.items()},
+            "mensen": {
+                mensa: {
+                    "counters": counters.get(mensa, {}),
+                    "phases": {name: describe(durations) for name, durations in mensen.get(mensa, {}).items()},
+                }
+                for mensa in sorted(set(mensen) | set(counters))
+            },
+        }
+
+    def trace_events(self):
+        """Alle Spannen im Chrome-Trace-Event-Format (Zeiten in Mikrosekunden)"""
+        pid = os.getpid()
+        with self.lock:
+            spans = list(self.spans)
+            threads = dict(self.threads)
+
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}}
+                  for tid, thread_name in threads.items()]
+        for name, mensa, start, duration, tid, args in spans:
+            event_args = dict(args)
+            if mensa is not None:
+                event_args["mensa"] = mensa
+            events.append({
+                "name": name,
+                "cat": name.split(".")[0],
+                "ph": "X",
+                "ts": round(start * 1e6, 1),
+                "dur": round(duration * 1e6, 1),
+                "pid": pid,
+                "tid": tid,
+                "args": event_args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_summary(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+
+    def write_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.trace_events(), f, ensure_ascii=False)
+
+    def print_summary(self):
+        """Kurzer Überblick am Ende des Laufs: wohin ist die Zeit gegangen?"""
+        summary = self.summary()
+        print(f"\n⏱️  Laufzeit {summary['total_seconds']:.1f}s")
+        for name, phase in sorted(summary["phases"].items(), key=lambda item: -item[1]["total"]):
+            print(f"  {name:<16} {phase['total']:8.2f}s  ({phase['count']}×, median {phase['median']:.3f}s)")
+        for mensa, values in summary["mensen"].items():
+            if values["counters"]:
+                counters = ", ".join(f"{counter} {n}" for counter, n in sorted(values["counters"].items()))
+                print(f"  📍 {mensa}: {counters}")
+
+# Gemeinsame Instanz für einen Lauf
+METRICS = Metrics()
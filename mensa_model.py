@@ -0,0 +1,138 @@
+"""
+Bratwurst Frühwarnsystem - Datenmodell
+Ein Speiseplan im Speicher: MensaPlan -> DayPlan -> Meal, alle mit __slots__.
+
+Normalisiert wird genau einmal beim Laden bzw. Scrapen (auch das alte Plain-String-Format),
+Render- und Auswertungscode greift danach nur noch auf Attribute zu. Über eine MealTable
+teilen sich gleiche Gerichte (Name + Preis) ein Meal-Objekt, Tags und Preise werden pro
+Gericht nur einmal berechnet.
+"""
+
+from collections.abc import Mapping
+import re
+import unicodedata
+
+KATEGORIEN = ('Aktionen', 'Essen')
+PRICE_TIERS = ('studierende', 'beschaeftigte', 'gaeste')
+PRICE_RE = re.compile(r'\d+,\d{2}')
+
+def fold_text(text):
+    """Normalisiert Text für Suche, Watchlist und Archiv: Kleinschreibung, Akzente/Umlaute entfernen, ß -> ss"""
+    decomposed = unicodedata.normalize('NFD', text.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).replace('ß', 'ss')
+
+def parse_preis(preis):
+    """'€ 2,95/3,25/3,55' -> (2.95, 3.25, 3.55) (Studierende, Beschäftigte, Gäste)"""
+    return tuple(float(value.replace(',', '.')) for value in PRICE_RE.findall(preis))[:len(PRICE_TIERS)]
+
+class Meal:
+    """Ein Gericht mit Preistext, numerischen Preisen pro Tarif und Watchlist-Tags"""
+
+    __slots__ = ('name', 'preis', 'preise', 'tags')
+
+    def __init__(self, name, preis='', tags=()):
+        self.name = name
+        self.preis = preis
+        self.preise = parse_preis(preis)
+        self.tags = tags
+
+    @classmethod
+    def from_json(cls, gericht):
+        """Einzige Stelle, die beide Formate kennt: dict mit 'name'/'preis' und alter Plain-String"""
+        if isinstance(gericht, str):
+            return cls(gericht)
+        return cls(gericht['name'], gericht.get('preis', ''))
+
+    def to_json(self, enriched=True):
+        if not enriched:
+            return {'name': self.name, 'preis': self.preis}
+        return {'name': self.name, 'preis': self.preis, 'preise': list(self.preise), 'tags': list(self.tags)}
+
+    def __repr__(self):
+        return f"Meal({self.name!r}, {self.preis!r})"
+
+class DayPlan:
+    """Gerichte eines Tages in einer Mensa, getrennt nach Aktionen und Essen"""
+
+    __slots__ = ('aktionen', 'essen')
+
+    def __init__(self, aktionen=(), essen=()):
+        self.aktionen = tuple(aktionen)
+        self.essen = tuple(essen)
+
+    @classmethod
+    def from_json(cls, kategorien):
+        return cls([Meal.from_json(gericht) for gericht in kategorien.get('Aktionen', ())],
+                   [Meal.from_json(gericht) for gericht in kategorien.get('Essen', ())])
+
+    def kategorien(self):
+        """(Kategorie, Gerichte) in fester Reihenfolge wie KATEGORIEN"""
+        return (('Aktionen', self.aktionen), ('Essen', self.essen))
+
+    @property
+    def dish_count(self):
+        return len(self.aktionen) + len(self.essen)
+
+    def to_json(self, enriched=True):
+        return {kategorie: [meal.to_json(enriched) for meal in meals] for kategorie, meals in self.kategorien()}
+
+class MensaPlan(Mapping):
+    """Alle Tage einer Mensa - verhält sich wie ein dict datum -> DayPlan"""
+
+    __slots__ = ('name', 'days')
+
+    def __init__(self, name, days):
+        self.name = name
+        self.days = days
+
+    def __getitem__(self, date_str):
+        return self.days[date_str]
+
+    def __iter__(self):
+        return iter(self.days)
+
+    def __len__(self):
+        return len(self.days)
+
+    def to_json(self, enriched=True):
+        return {date_str: day.to_json(enriched) for date_str, day in self.days.items()}
+
+class MealTable:
+    """Interniert Gerichte: jedes (Name, Preis) gibt es nur einmal, klassifiziert mit 'matcher'"""
+
+    def __init__(self, matcher=None):
+        self.matcher = matcher
+        self.meals = {}
+        self.tags = {}
+
+    def meal(self, name, preis=''):
+        key = (name, preis)
+        meal = self.meals.get(key)
+        if meal is None:
+            if name not in self.tags:
+                self.tags[name] = tuple(self.matcher.tags(name)) if self.matcher else ()
+            meal = self.meals[key] = Meal(name, preis, self.tags[name])
+        return meal
+
+    def day(self, day):
+        return DayPlan([self.meal(meal.name, meal.preis) for meal in day.aktionen],
+                       [self.meal(meal.name, meal.preis) for meal in day.essen])
+
+    def dataset(self, all_data):
+        """{mensa: {datum: DayPlan}} -> {mensa: MensaPlan} mit internierten, klassifizierten Gerichten"""
+        return {mensa_name: MensaPlan(mensa_name, {date_str: self.day(day) for date_str, day in dates.items()})
+                for mensa_name, dates in all_data.items()}
+
+def days_from_json(data):
+    """mensen_data.json-Format -> {mensa: {datum: DayPlan}}"""
+    return {mensa_name: {date_str: DayPlan.from_json(kategorien) for date_str, kategorien in dates.items()}
+            for mensa_name, dates in data.items()}
+
+def from_json(data, matcher=None):
+    """mensen_data.json-Format -> fertiger Datensatz {mensa: MensaPlan}"""
+    return MealTable(matcher).dataset(days_from_json(data))
+
+def to_json(all_data, enriched=True):
+    """Datensatz -> mensen_data.json-Format"""
+    return {mensa_name: {date_str: day.to_json(enriched) for date_str, day in dates.items()}
+            for mensa_name, dates in all_data.items()}
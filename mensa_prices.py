@@ -0,0 +1,142 @@
+"""
+Bratwurst Frühwarnsystem - Preise
+Spaltenorientierte Preistabelle über alle Gerichte mit günstigstem Gericht pro Tag,
+Durchschnittspreis pro Mensa und Preisänderungen. Preise kommen bereits geparst aus
+dem Modell (Meal.preise, eine Zahl pro Tarif).
+"""
+
+from array import array
+from datetime import datetime
+import math
+
+# NumPy beschleunigt die Preis-Aggregate, ist aber optional
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from mensa_model import PRICE_TIERS
+
+class PriceTable:
+    """Spaltenorientierte Preistabelle: eine array-Spalte pro Merkmal statt verschachtelter dicts
+
+    Mensen und Gerichte sind als Integer-IDs abgelegt, Datumswerte als Ordinalzahlen,
+    fehlende Preisstufen als NaN. Mit NumPy werden die Spalten ohne Kopie übernommen
+    und die Aggregate vektorisiert berechnet, sonst in einem einzigen Python-Durchlauf.
+    """
+
+    def __init__(self):
+        self.mensen = []
+        self.gerichte = []
+        self._mensa_ids = {}
+        self._gericht_ids = {}
+        self._days = {}
+        self.mensa = array('I')
+        self.day = array('I')
+        self.gericht = array('I')
+        self.tiers = [array('d') for _ in PRICE_TIERS]
+
+    def __len__(self):
+        return len(self.day)
+
+    def add(self, mensa_name, date_str, name, preise):
+        self.mensa.append(self._mensa_ids.setdefault(mensa_name, len(self._mensa_ids)))
+        if len(self._mensa_ids) > len(self.mensen):
+            self.mensen.append(mensa_name)
+        self.gericht.append(self._gericht_ids.setdefault(name, len(self._gericht_ids)))
+        if len(self._gericht_ids) > len(self.gerichte):
+            self.gerichte.append(name)
+        day = self._days.get(date_str)
+        if day is None:
+            day = self._days[date_str] = datetime.strptime(date_str, '%Y-%m-%d').toordinal()
+        self.day.append(day)
+        for tier, column in enumerate(self.tiers):
+            column.append(preise[tier] if tier < len(preise) else math.nan)
+
+    @classmethod
+    def from_data(cls, all_data):
+        """Baut die Tabelle in einem Durchlauf, Tage pro Mensa chronologisch"""
+        table = cls()
+        for mensa_name, dates in all_data.items():
+            for date_str in sorted(dates):
+                for _, meals in dates[date_str].kategorien():
+                    for meal in meals:
+                        table.add(mensa_name, date_str, meal.name, meal.preise)
+        return table
+
+    def summarize(self, tier=0):
+        """Günstigstes Gericht pro Tag und Mensa, Durchschnittspreis pro Mensa und Preisänderungen
+
+        Gibt ein dict mit 'cheapest' {(datum, mensa): (name, preis)}, 'average' {mensa: preis}
+        und 'changes' [(datum, mensa, name, alter_preis, neuer_preis)] zurück.
+        """
+        if np is not None:
+            return self._summarize_numpy(tier)
+
+        cheapest = {}
+        sums = [0.0] * len(self.mensen)
+        counts = [0] * len(self.mensen)
+        last_price = {}
+        changes = []
+        prices = self.tiers[tier]
+
+        for row in range(len(self)):
+            price = prices[row]
+            if math.isnan(price):
+                continue
+            mensa, day, gericht = self.mensa[row], self.day[row], self.gericht[row]
+            sums[mensa] += price
+            counts[mensa] += 1
+            key = (day, mensa)
+            if key not in cheapest or price < cheapest[key][1]:
+                cheapest[key] = (gericht, price)
+            previous = last_price.get((mensa, gericht))
+            if previous is not None and previous[1] != price and previous[0] < day:
+                changes.append((day, mensa, gericht, previous[1], price))
+            last_price[(mensa, gericht)] = (day, price)
+
+        average = {mensa: sums[mensa] / counts[mensa] for mensa in range(len(self.mensen)) if counts[mensa]}
+        return self._labels(cheapest, average, changes)
+
+    def _summarize_numpy(self, tier):
+        mensa = np.frombuffer(self.mensa, dtype=np.uint32).astype(np.int64)
+        day = np.frombuffer(self.day, dtype=np.uint32).astype(np.int64)
+        gericht = np.frombuffer(self.gericht, dtype=np.uint32).astype(np.int64)
+        prices = np.frombuffer(self.tiers[tier], dtype=np.float64)
+        valid = ~np.isnan(prices)
+        mensa, day, gericht, prices = mensa[valid], day[valid], gericht[valid], prices[valid]
+
+        # Durchschnitt pro Mensa
+        counts = np.bincount(mensa, minlength=len(self.mensen))
+        sums = np.bincount(mensa, weights=prices, minlength=len(self.mensen))
+        average = {int(m): float(sums[m] / counts[m]) for m in np.nonzero(counts)[0]}
+
+        # Günstigstes Gericht: nach (Tag, Mensa, Preis) sortieren, erstes pro Gruppe nehmen
+        order = np.lexsort((prices, mensa, day))
+        group = day[order] * len(self.mensen) + mensa[order]
+        first = order[np.concatenate(([True], group[1:] != group[:-1]))] if len(order) else order
+        cheapest = {(int(day[i]), int(mensa[i])): (int(gericht[i]), float(prices[i])) for i in first}
+
+        # Preisänderungen: nach (Mensa, Gericht, Tag) sortieren und Nachbarn vergleichen
+        order = np.lexsort((day, gericht, mensa))
+        same = (mensa[order][1:] == mensa[order][:-1]) & (gericht[order][1:] == gericht[order][:-1])
+        changed = same & (prices[order][1:] != prices[order][:-1]) & (day[order][1:] != day[order][:-1])
+        changes = [(int(day[new]), int(mensa[new]), int(gericht[new]), float(prices[old]), float(prices[new]))
+                   for old, new in zip(order[:-1][changed], order[1:][changed])]
+        return self._labels(cheapest, average, changes)
+
+    def _labels(self, cheapest, average, changes):
+        """Ersetzt IDs und Ordinalzahlen durch Namen und Datums-Strings"""
+        def date_str(day):
+            return datetime.fromordinal(day).strftime('%Y-%m-%d')
+        return {
+            'cheapest': {(date_str(day), self.mensen[mensa]): (self.gerichte[gericht], price)
+                         for (day, mensa), (gericht, price) in cheapest.items()},
+            'average': {self.mensen[mensa]: price for mensa, price in average.items()},
+            'changes': sorted((date_str(day), self.mensen[mensa], self.gerichte[gericht], old, new)
+                              for day, mensa, gericht, old, new in changes),
+        }
+
+def format_euro(value):
+    """2.5 -> '2,50 €'"""
+    return f"{value:.2f} €".replace('.', ',')
@@ -0,0 +1,47 @@
+"""
+Bratwurst Frühwarnsystem - Suchindex
+Invertierter Index über alle Gerichte der Seite: normalisierte Tokens zeigen auf Gericht-IDs,
+jedes Gericht auf seine Tabellenzeile. Das Script der Seite sucht nur noch im Index,
+nicht mehr im DOM.
+"""
+
+import json
+import re
+
+from mensa_model import fold_text
+
+SEARCH_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+class SearchIndex:
+    """Kompakter invertierter Index für die Suche im Browser
+
+    Tokens sind sortiert, jedes Token zeigt auf die IDs der Gerichte (delta-kodiert),
+    'rows' ordnet jedem Gericht seine Tabellenzeile zu. Teilwort-Suche über Suffixe
+    baut das Script im Browser einmalig aus den Tokens auf.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.rows = []
+
+    def add(self, text, row_id):
+        dish_id = len(self.rows)
+        self.rows.append(row_id)
+        for token in set(SEARCH_TOKEN_RE.findall(fold_text(text))):
+            self.postings.setdefault(token, []).append(dish_id)
+        return dish_id
+
+    def to_json(self):
+        tokens = sorted(self.postings)
+        postings = []
+        for token in tokens:
+            previous = 0
+            deltas = []
+            for dish_id in self.postings[token]:
+                deltas.append(dish_id - previous)
+                previous = dish_id
+            postings.append(deltas)
+        payload = json.dumps({"tokens": tokens, "postings": postings, "rows": self.rows},
+                             ensure_ascii=False, separators=(',', ':'))
+        # Darf den umgebenden <script>-Block nicht beenden
+        return payload.replace('</', '<\\/')
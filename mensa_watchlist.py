@@ -0,0 +1,68 @@
+"""
+Bratwurst Frühwarnsystem - Watchlist
+Klassifiziert Gerichte gegen eine konfigurierbare Liste von Suchbegriffen (Tag -> Begriffe)
+in einem einzigen Durchlauf über den Namen. Die Tags landen am Meal und steuern
+Hervorhebung und Statistik der Seite.
+"""
+
+from collections import deque
+
+from mensa_model import fold_text
+
+# Watchlist: Tag -> Suchbegriffe (Groß-/Kleinschreibung und Umlaute egal)
+WATCHLIST = {
+    "bratwurst": ["bratwurst"],
+    "currywurst": ["currywurst"],
+    "schnitzel": ["schnitzel"],
+    "vegan": ["vegan"],
+}
+
+class WatchlistMatcher:
+    """Aho-Corasick-Automat über alle Watchlist-Begriffe
+
+    Jedes Gericht wird in einem einzigen Durchlauf über den Namen klassifiziert,
+    unabhängig davon, wie viele Begriffe auf der Watchlist stehen.
+    """
+
+    def __init__(self, watchlist):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [set()]
+
+        for tag, keywords in watchlist.items():
+            for keyword in keywords:
+                state = 0
+                for char in fold_text(keyword):
+                    if char not in self.goto[state]:
+                        self.goto.append({})
+                        self.fail.append(0)
+                        self.output.append(set())
+                        self.goto[state][char] = len(self.goto) - 1
+                    state = self.goto[state][char]
+                self.output[state].add(tag)
+
+        # Fail-Links per Breitensuche, Ausgaben der Fail-Zustände übernehmen
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] |= self.output[self.fail[next_state]]
+
+    def tags(self, text):
+        """Sortierte Liste aller Tags, deren Begriffe in 'text' vorkommen"""
+        state = 0
+        found = set()
+        for char in fold_text(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            if self.output[state]:
+                found |= self.output[state]
+        return sorted(found)
+
+DEFAULT_MATCHER = WatchlistMatcher(WATCHLIST)
@@ -1,27 +1,292 @@
 """
 Bratwurst Frühwarnsystem - Mensen Scraper für GitHub Actions
 Scrapt tägliche Speisepläne verschiedener Mensen und generiert eine HTML-Seite
+
+Beispiele:
+    python scrape_mensen.py --incremental --archive        (= scrape, Standard)
+    python scrape_mensen.py scrape-one "HU Süd" --days 7
+    python scrape_mensen.py render --output split
+
+Selenium, BeautifulSoup und requests werden erst in den Funktionen importiert, die sie
+brauchen - 'render' kommt ganz ohne sie aus und startet entsprechend schnell.
 """
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
+from html import escape
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor, Future
+from collections import Counter
+from functools import lru_cache
+import importlib.util
+import argparse
 import time
 import json
+import re
+import threading
+import statistics
+import hashlib
+import tempfile
+import gzip
+import zlib
+import sys
+import os
+
+import mensa_archive
+import mensa_assets
+import mensa_calendar
+import mensa_changes
+import mensa_compact
+import mensa_model
+import mensa_prices
+import mensa_search
+import mensa_watchlist
+from mensa_changes import day_hash
+from mensa_model import DayPlan, Meal
+from mensa_metrics import METRICS
+
+# lxml ist deutlich schneller als html.parser, aber optional (nur nachsehen, noch nicht importieren)
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
 
-# Mensa-URLs
+# Eingebaute Mensen, falls es keine Registry-Datei (mensen.json) gibt
 MENSEN = {
     "HU Nord": "https://www.stw.berlin/mensen/einrichtungen/humboldt-universität-zu-berlin/mensa-hu-nord.html",
     "HU Süd": "https://www.stw.berlin/mensen/einrichtungen/humboldt-universität-zu-berlin/mensa-hu-süd.html",
     "TU Hardenbergstraße": "https://www.stw.berlin/mensen/einrichtungen/technische-universität-berlin/mensa-tu-hardenbergstraße.html",
 }
 
-def setup_driver():
-    """Konfiguriert Chrome WebDriver für GitHub Actions (headless)"""
+# Registry: Mensen mit Horizont, Priorität und enabled-Flag (Fallback: MENSEN)
+MENSEN_FILE = "mensen.json"
+DEFAULT_DAYS = 31
+DEFAULT_PRIORITY = 0
+
+# Scheduler: globales Limit für Requests an stw.berlin über alle Worker
+REQUESTS_PER_SECOND = 4.0
+# Geschätzte Sekunden pro Tag, solange es keine Metriken eines früheren Laufs gibt
+DEFAULT_DAY_COST = 1.0
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Endpoint, den loadSpeiseplanWochentag() per POST (resources_id, date) abfragt
+SPEISEPLAN_XHR_PATH = "/xhr/speiseplan-wochentag.html"
+RESOURCES_ID_PATTERNS = [
+    r"resources_id['\"]?\s*[:=]\s*['\"]?(\d+)",
+    r'name="resources_id"[^>]*value="(\d+)"',
+    r'<option[^>]*value="(\d+)"[^>]*selected',
+]
+HTTP_TIMEOUT = 20
+# Ein XHR-Fragment ohne Speiseplan-Gruppen zählt nur als leerer Tag, wenn es das auch sagt -
+# sonst ist es eine Fehlerseite oder der Endpoint ist umgezogen
+SPEISEPLAN_MARKER = "splGroupWrapper"
+CLOSED_DAY_MARKERS = ("geschlossen", "kein speiseplan", "keine speisen")
+
+# Tageswechsel: loadSpeiseplanWochentag() anstoßen und auf den neuen Inhalt warten.
+# Vor dem Aufruf werden die alten Gerichte markiert - fertig ist der Tag erst, wenn
+# kein AJAX-Request mehr läuft und alle markierten Knoten ersetzt wurden.
+TRIGGER_DAY_JS = """
+document.querySelectorAll('.splGroupWrapper').forEach(function(e) { e.setAttribute('data-bw-stale', '1'); });
+loadSpeiseplanWochentag(arguments[0]);
+"""
+DAY_READY_JS = """
+if (window.jQuery && jQuery.active > 0) { return false; }
+return document.querySelector('[data-bw-stale]') === null;
+"""
+DAY_TIMEOUT = 10
+DAY_POLL_INTERVAL = 0.05
+
+# Request-Filter für Chrome (Network.setBlockedURLs): für loadSpeiseplanWochentag() reichen
+# HTML, jQuery und die Skripte der Seite. Einträge in "block" sind Ressourcentypen aus
+# BLOCK_TYPE_PATTERNS oder URL-Muster mit *, "allow" nimmt Einträge wieder heraus.
+BLOCK_TYPE_PATTERNS = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.png?*", "*.jpg?*", "*.jpeg?*",
+              "*.webp?*", "*.svg?*"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.woff?*", "*.woff2?*", "*.ttf?*"],
+    "stylesheet": ["*.css", "*.css?*"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.ogg"],
+}
+REQUEST_FILTER = {
+    "block": ["image", "font", "stylesheet", "media",
+              "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*facebook.net*",
+              "*hotjar.com*", "*youtube.com*", "*ytimg.com*", "*maps.googleapis.com*", "*fonts.googleapis.com*"],
+    "allow": [],
+}
+
+# Holt im Browser nur die Speiseplan-Gruppen statt der kompletten page_source
+SPEISEPLAN_FRAGMENT_JS = """
+return Array.from(document.querySelectorAll('.splGroupWrapper'), function(e) { return e.outerHTML; }).join('');
+"""
+
+# Parsen läuft in einem eigenen Thread-Pool, während schon der nächste Tag geladen wird.
+# Pro Mensa warten höchstens PARSE_QUEUE_SIZE Fragmente, sonst blockiert der Fetch (Backpressure).
+PARSE_WORKERS = 2
+PARSE_QUEUE_SIZE = 4
+
+# Geschätzter Speicherbedarf pro Worker für das Speicherbudget des Pools
+CHROME_MEMORY_MB = 350
+TAB_MEMORY_MB = 120
+MEMORY_BUDGET_MB = 1500
+
+# Inkrementeller Modus: Daten und Tages-Hashes des letzten Laufs
+DATA_FILE = "mensen_data.json"
+STATE_FILE = "mensen_state.json"
+REFRESH_DAYS = 7
+SAMPLE_RATE = 0.25
+MAX_AGE_DAYS = 4
+# Jeder Re-Scrape mit unverändertem Hash verlängert das Höchstalter eines Tages um MAX_AGE_DAYS,
+# höchstens bis hierhin - was lange gleich bleibt, ändert sich selten noch
+STABLE_MAX_AGE_DAYS = 12
+
+# Übersprungene Tage (Wochenende, Feiertag, Navigation) mit Grund
+CALENDAR_FILE = "mensen_calendar.json"
+
+# Checkpoint: jeder fertige Mensa-Tag landet sofort als JSON-Zeile hier (--resume)
+CHECKPOINT_FILE = "mensen_checkpoint.jsonl"
+
+# Laufzeit-Metriken (--metrics/--trace)
+METRICS_FILE = "mensen_metrics.json"
+TRACE_FILE = "mensen_trace.json"
+
+def load_registry(path=MENSEN_FILE):
+    """Lädt die Mensa-Registry aus 'path' - ohne Datei gelten die eingebauten MENSEN
+    
+    Gibt (Einträge, Konfiguration) zurück. Jeder Eintrag hat name, url, days, priority und
+    enabled; fehlende Werte kommen aus "defaults" der Datei bzw. DEFAULT_DAYS/DEFAULT_PRIORITY.
+    """
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    else:
+        config = {"mensen": [{"name": name, "url": url} for name, url in MENSEN.items()]}
+    
+    defaults = {"days": DEFAULT_DAYS, "priority": DEFAULT_PRIORITY, "enabled": True}
+    defaults.update(config.get("defaults", {}))
+    
+    registry = []
+    for entry in config["mensen"]:
+        if not entry.get("name") or not entry.get("url"):
+            raise ValueError(f"{path}: Mensa-Eintrag ohne name/url: {entry}")
+        if any(known["name"] == entry["name"] for known in registry):
+            raise ValueError(f"{path}: Mensa '{entry['name']}' ist doppelt eingetragen")
+        registry.append({**defaults, **entry})
+    return registry, config
+
+class RateLimiter:
+    """Token-Bucket für alle Worker zusammen: höchstens 'rate' Requests pro Sekunde
+    
+    rate <= 0 schaltet das Limit ab. Wartende Threads reservieren ihren Slot unter dem
+    Lock und schlafen danach ohne Lock, so bleibt die Reihenfolge fair.
+    """
+    
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        if delay > 0:
+            with METRICS.span("throttle"):
+                time.sleep(delay)
+
+def day_costs_from_metrics(metrics):
+    """Sekunden pro Tag und Mensa aus den Metriken (--metrics) eines früheren Laufs"""
+    costs = {}
+    for mensa_name, values in metrics.get("mensen", {}).items():
+        scrape = values.get("phases", {}).get("scrape")
+        days = sum(values.get("counters", {}).get(counter, 0) for counter in ("days", "empty_days", "failures"))
+        if scrape and days:
+            costs[mensa_name] = scrape["total"] / days
+    return costs
+
+def schedule(plans, priorities=None, day_costs=None):
+    """Reihenfolge, in der die Mensen an den Worker-Pool gehen
+    
+    Höhere Priorität zuerst, innerhalb einer Priorität die teuersten Mensen zuerst
+    (Longest Processing Time) - der Pool verteilt sie dann gierig auf freie Worker.
+    """
+    priorities = priorities or {}
+    day_costs = day_costs or {}
+    
+    def cost(mensa_name):
+        return len(plans[mensa_name]) * day_costs.get(mensa_name, DEFAULT_DAY_COST)
+    
+    return sorted((name for name in plans if plans[name]), key=lambda name: (-priorities.get(name, 0), -cost(name)))
+
+def estimate_runtime(order, plans, workers, rate, day_costs=None):
+    """Geschätzte Laufzeit in s: Verteilung auf 'workers', mindestens aber Requests / 'rate'"""
+    day_costs = day_costs or {}
+    finish = [0.0] * max(1, workers)
+    for mensa_name in order:
+        slot = finish.index(min(finish))
+        finish[slot] += len(plans[mensa_name]) * day_costs.get(mensa_name, DEFAULT_DAY_COST)
+    # Pro Mensa ein Seitenaufruf plus ein Request pro Tag
+    requests_total = sum(len(plans[name]) + 1 for name in order)
+    return max(max(finish), requests_total / rate if rate > 0 else 0)
+
+def blocked_url_patterns(request_filter):
+    """Übersetzt die Filter-Konfiguration in URL-Muster für Network.setBlockedURLs"""
+    allowed = set(request_filter.get("allow", []))
+    patterns = []
+    for entry in request_filter.get("block", []):
+        if entry in allowed:
+            continue
+        for pattern in BLOCK_TYPE_PATTERNS.get(entry, [entry]):
+            if pattern not in allowed and pattern not in patterns:
+                patterns.append(pattern)
+    return patterns
+
+def block_requests(driver, patterns):
+    """Blockiert die Muster im aktuellen Tab - neue Tabs brauchen einen eigenen Aufruf"""
+    if patterns:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+def drain_performance_log(driver):
+    """Netzwerk-Events seit dem letzten Aufruf: (Requests, blockiert nach Typ, übertragene Bytes)"""
+    requests_sent = 0
+    blocked = Counter()
+    transferred = 0
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            requests_sent += 1
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked[params.get("type", "Other")] += 1
+        elif method == "Network.loadingFinished":
+            transferred += params.get("encodedDataLength", 0)
+    return requests_sent, blocked, transferred
+
+def report_page_load(driver, mensa_name):
+    """Gibt aus, was beim Laden der Seite blockiert bzw. übertragen wurde, und zählt es mit"""
+    try:
+        requests_sent, blocked, transferred = drain_performance_log(driver)
+    except Exception:
+        # Ohne Performance-Log (z.B. anderer Driver) gibt es eben keinen Bericht
+        return
+    METRICS.count(mensa_name, "page_requests", requests_sent)
+    METRICS.count(mensa_name, "blocked_requests", sum(blocked.values()))
+    METRICS.count(mensa_name, "page_bytes", transferred)
+    details = ", ".join(f"{resource_type} {n}" for resource_type, n in blocked.most_common())
+    print(f"  🚫 {mensa_name}: {sum(blocked.values())} von {requests_sent} Requests blockiert"
+          f"{f' ({details})' if details else ''}, {transferred / 1024:.1f} kB übertragen")
+
+def setup_driver(blocked_urls=None):
+    """Konfiguriert Chrome WebDriver für GitHub Actions (headless)
+    
+    'blocked_urls' sind URL-Muster, die Chrome gar nicht erst anfragt (siehe blocked_url_patterns).
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    
     chrome_options = Options()
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--no-sandbox")
@@ -32,188 +297,771 @@ def setup_driver():
     chrome_options.add_argument("--disable-background-networking")
     chrome_options.add_argument("--window-size=1920,1080")
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_argument("user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
     chrome_options.page_load_strategy = 'normal'
     chrome_options.set_capability('timeouts', {'implicit': 30000, 'pageLoad': 60000, 'script': 60000})
-    return webdriver.Chrome(options=chrome_options)
+    # Netzwerk-Events für den Bericht pro Seitenaufruf
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    with METRICS.span("setup_driver"):
+        driver = webdriver.Chrome(options=chrome_options)
+        block_requests(driver, blocked_urls)
+    return driver
 
-def scrape_mensa(driver, url, mensa_name, days=14):
-    """Scrapt Speiseplan einer Mensa für die nächsten 'days' Tage - nur Kategorien Aktionen und Essen"""
-    print(f"\n🍽️  Scrape {mensa_name}...")
+def setup_session():
+    """Erstellt eine HTTP-Session mit Keep-Alive Connection-Pool für den Browserless-Modus"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504],
+                  allowed_methods=["GET", "POST"])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Language": "de-DE,de;q=0.9",
+    })
+    return session
+
+@lru_cache(maxsize=None)
+def speiseplan_strainer():
+    """Beim Parsen alles außerhalb der Speiseplan-Gruppen direkt verwerfen
+    
+    Der Strainer sieht das class-Attribut noch als ganzen String - ein einfacher Klassenname
+    würde "container-fluid splGroupWrapper" nicht treffen.
+    """
+    from bs4 import SoupStrainer
+    return SoupStrainer("div", class_=re.compile(rf"(^|\s){SPEISEPLAN_MARKER}(\s|$)"))
+
+def parse_speiseplan(html):
+    """Extrahiert die Kategorien Aktionen und Essen aus Seite oder XHR-Fragment als DayPlan"""
+    from bs4 import BeautifulSoup
+    
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=speiseplan_strainer())
+    
+    # Nur Kategorien "Aktionen" und "Essen" extrahieren
+    gerichte_kategorien = {'Aktionen': [], 'Essen': []}
+    
+    # Finde alle splGroupWrapper divs
+    group_wrappers = soup.find_all("div", class_="splGroupWrapper")
+    
+    for wrapper in group_wrappers:
+        # Kategorie-Name finden
+        group_div = wrapper.find("div", class_="splGroup")
+        if group_div:
+            kategorie = group_div.text.strip()
+            
+            # Nur wenn Kategorie Aktionen oder Essen ist
+            if kategorie in ['Aktionen', 'Essen']:
+                # Alle Gerichte in dieser Kategorie finden
+                meals = wrapper.find_all("div", class_="splMeal")
+                for meal in meals:
+                    gericht_span = meal.find("span", class_="bold")
+                    if gericht_span:
+                        gericht_name = gericht_span.text.strip()
+                        
+                        # Preis extrahieren (im Format "€ 3,65/7,30/8,40")
+                        preis = ""
+                        preis_div = meal.find("div", class_="text-right")
+                        if preis_div:
+                            preis_text = preis_div.get_text(strip=True)
+                            if '€' in preis_text:
+                                preis = preis_text.split('\n')[0].strip()
+                        
+                        gerichte_kategorien[kategorie].append(Meal(gericht_name, preis))
+    
+    return DayPlan(gerichte_kategorien['Aktionen'], gerichte_kategorien['Essen'])
+
+def day_range(days):
+    """Datums-Strings für heute und die folgenden 'days' - 1 Tage"""
+    heute = datetime.today()
+    return [(heute + timedelta(days=day_offset)).strftime('%Y-%m-%d') for day_offset in range(days)]
+
+def log_tag(speiseplan, date_str, day, mensa_name):
+    """Speichert einen Tag nur, wenn mindestens ein Gericht gefunden wurde"""
+    if day.dish_count:
+        speiseplan[date_str] = day
+        print(f"  ✓ {mensa_name} {date_str}: {day.dish_count} Gerichte (Aktionen: {len(day.aktionen)}, Essen: {len(day.essen)})")
+        METRICS.count(mensa_name, "days")
+    else:
+        print(f"  - {mensa_name} {date_str}: Keine Gerichte")
+        METRICS.count(mensa_name, "empty_days")
+
+class ParsePipeline:
+    """Parst die Fragmente einer Mensa im Hintergrund, während der Fetch-Thread weiterlädt
+    
+    Ohne 'executor' wird direkt beim submit() geparst. finish() trägt die Tage in
+    Abrufreihenfolge in den Speiseplan ein, fehlerhafte Tage landen in 'failed'.
+    """
+    
+    def __init__(self, executor, mensa_name, speiseplan, failed, max_pending=PARSE_QUEUE_SIZE, checkpoint=None):
+        self.executor = executor
+        self.checkpoint = checkpoint
+        self.mensa_name = mensa_name
+        self.speiseplan = speiseplan
+        self.failed = failed
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.pending = []
+    
+    def parse(self, date_str, html):
+        with METRICS.span("parse", self.mensa_name, date=date_str):
+            day = parse_speiseplan(html)
+        if self.checkpoint is not None:
+            self.checkpoint.record(self.mensa_name, date_str, day)
+        return day
+    
+    def submit(self, date_str, html):
+        if self.executor is None:
+            future = Future()
+            try:
+                future.set_result(self.parse(date_str, html))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            # Wartet, solange schon max_pending Fragmente dieser Mensa im Pool liegen
+            self.slots.acquire()
+            future = self.executor.submit(self.parse, date_str, html)
+            future.add_done_callback(lambda _: self.slots.release())
+        self.pending.append((date_str, future))
+    
+    def finish(self):
+        for date_str, future in self.pending:
+            try:
+                log_tag(self.speiseplan, date_str, future.result(), self.mensa_name)
+            except Exception as e:
+                print(f"  ❌ {self.mensa_name} - Fehler beim Parsen von {date_str}: {str(e)}")
+                self.failed.append(date_str)
+        self.pending = []
+        return self.speiseplan
+
+class Checkpoint:
+    """Schreibt jeden fertig geparsten Mensa-Tag sofort als JSON-Zeile
+    
+    Bricht der Lauf ab, ist alles bis dahin Gescrapte noch da - siehe load_checkpoint().
+    Ohne 'resume' wird eine vorhandene Datei überschrieben.
+    """
+    
+    def __init__(self, path=CHECKPOINT_FILE, resume=False):
+        self.path = path
+        self.lock = threading.Lock()
+        self.scraped = datetime.today().strftime('%Y-%m-%d')
+        self.file = open(path, "a" if resume else "w", encoding="utf-8")
+    
+    def record(self, mensa_name, date_str, day):
+        line = json.dumps({"scraped": self.scraped, "mensa": mensa_name, "date": date_str,
+                           "kategorien": day.to_json(enriched=False)}, ensure_ascii=False)
+        with self.lock:
+            self.file.write(line + "\n")
+            # Sofort an das OS übergeben, damit auch ein abgeschossener Prozess nichts verliert
+            self.file.flush()
+    
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+def load_checkpoint(path=CHECKPOINT_FILE):
+    """Heute bereits gescrapte Tage aus dem Checkpoint: {mensa: {datum: DayPlan}}
+    
+    Einträge früherer Tage und abgeschnittene letzte Zeilen werden ignoriert.
+    """
+    today_str = datetime.today().strftime('%Y-%m-%d')
+    done = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("scraped") == today_str:
+                    done.setdefault(entry["mensa"], {})[entry["date"]] = DayPlan.from_json(entry["kategorien"])
+    except OSError:
+        pass
+    return done
+
+def skip_by_navigation(mensa_name, dates, nav_text, skipped):
+    """Lässt Tage weg, die die Tagesnavigation der Seite nicht anbietet, und merkt sie in 'skipped'"""
+    dates, nav_skipped = mensa_calendar.filter_by_navigation(dates, mensa_calendar.navigation_dates(nav_text))
+    if nav_skipped:
+        skipped.update(nav_skipped)
+        print(f"  📅 {mensa_name}: {len(nav_skipped)} Tage laut Tagesnavigation geschlossen")
+    return dates
+
+def find_resources_id(html):
+    """Sucht die interne Einrichtungs-ID, die loadSpeiseplanWochentag() mitschickt"""
+    for pattern in RESOURCES_ID_PATTERNS:
+        match = re.search(pattern, html)
+        if match:
+            return match.group(1)
+    return None
+
+def is_speiseplan_fragment(html):
+    """Grobe Prüfung einer XHR-Antwort: Speiseplan-Gruppen oder Hinweis auf geschlossenen Tag"""
+    if SPEISEPLAN_MARKER in html:
+        return True
+    text = html.lower()
+    return any(marker in text for marker in CLOSED_DAY_MARKERS)
+
+def scrape_mensa_http(session, url, mensa_name, days=14, dates=None, failed=None, limiter=None, parse_pool=None,
+                      checkpoint=None, skipped=None):
+    """Scrapt Speiseplan ohne Browser: schickt denselben XHR-Request wie loadSpeiseplanWochentag()
+    
+    Gibt None zurück, wenn die Seite nicht wie erwartet aufgebaut ist oder keine einzige
+    XHR-Antwort nach Speiseplan aussieht (auch HTTP-Fehler) - dann übernimmt Chrome und
+    'failed' bleibt unberührt. Einzelne unerwartete Antworten zählen als fehlgeschlagen,
+    nicht als leerer Tag.
+    Fehlgeschlagene Tage werden an 'failed' angehängt (falls übergeben), Tage, die die
+    Tagesnavigation nicht anbietet, landen mit Grund in 'skipped'.
+    Mit 'parse_pool' wird parallel zum nächsten Request geparst.
+    """
+    import requests
+    
+    dates = day_range(days) if dates is None else dates
+    failed = [] if failed is None else failed
+    skipped = {} if skipped is None else skipped
+    print(f"\n🍽️  Scrape {mensa_name} (HTTP)...")
+    
+    try:
+        if limiter:
+            limiter.acquire()
+        with METRICS.span("http.get", mensa_name):
+            response = session.get(url, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"⚠️  HTTP-Abruf von {mensa_name} fehlgeschlagen: {e}")
+        return None
+    
+    resources_id = find_resources_id(response.text)
+    if not resources_id:
+        print(f"⚠️  Keine resources_id für {mensa_name} gefunden")
+        return None
+    
+    dates = skip_by_navigation(mensa_name, dates, response.text, skipped)
+    
+    # Relativ zur Mensa-URL, damit auch ein lokaler Stand-in-Server funktioniert
+    xhr_url = urljoin(response.url, SPEISEPLAN_XHR_PATH)
+    headers = {"X-Requested-With": "XMLHttpRequest", "Referer": response.url}
+    
+    # Erst sammeln: übernimmt Chrome, darf nichts davon in 'failed' des Aufrufers stehen
+    day_failed = []
+    pipeline = ParsePipeline(parse_pool, mensa_name, {}, day_failed, checkpoint=checkpoint)
+    recognized = 0
+    errors = []
+    unexpected = []
+    
+    for date_str in dates:
+        try:
+            if limiter:
+                limiter.acquire()
+            with METRICS.span("http.post", mensa_name, date=date_str):
+                day_response = session.post(
+                    xhr_url,
+                    data={"resources_id": resources_id, "date": date_str},
+                    headers=headers,
+                    timeout=HTTP_TIMEOUT,
+                )
+            day_response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"  ❌ {mensa_name} - Fehler bei {date_str}: {str(e)}")
+            errors.append(date_str)
+            continue
+        if is_speiseplan_fragment(day_response.text):
+            recognized += 1
+            pipeline.submit(date_str, day_response.text)
+        else:
+            unexpected.append(date_str)
+    
+    speiseplan = pipeline.finish()
+    if (errors or unexpected) and not recognized:
+        print(f"⚠️  Keine Speiseplan-Antwort für {mensa_name} erhalten ({xhr_url})")
+        return None
+    for date_str in unexpected:
+        print(f"  ❌ {mensa_name} - Unerwartete Antwort für {date_str}")
+    failed.extend(errors + day_failed + unexpected)
+    return speiseplan
+
+def open_mensa(driver, url, mensa_name, limiter=None):
+    """Lädt die Mensa-Seite im aktuellen Tab und wartet auf den Speiseplan"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+    
+    # Netzwerk-Events früherer Seiten und Tage verwerfen, der Bericht gilt nur diesem Aufruf
+    try:
+        driver.get_log("performance")
+    except Exception:
+        pass
     
     # Mehrere Versuche mit erhöhtem Timeout
     max_retries = 3
     for attempt in range(max_retries):
         try:
             driver.set_page_load_timeout(60)
-            driver.get(url)
+            if limiter:
+                limiter.acquire()
+            with METRICS.span("driver.get", mensa_name, attempt=attempt + 1):
+                driver.get(url)
             break
         except Exception as e:
             print(f"⚠️  Versuch {attempt + 1}/{max_retries} fehlgeschlagen: {e}")
             if attempt < max_retries - 1:
+                METRICS.count(mensa_name, "retries")
                 time.sleep(5)
             else:
                 print(f"❌ Konnte {mensa_name} nach {max_retries} Versuchen nicht laden")
-                return {}
+                return False
     
     try:
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.ID, "spltag1"))
-        )
+        with METRICS.span("page.ready", mensa_name):
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.ID, "spltag1"))
+            )
     except Exception as e:
         print(f"❌ Konnte Speiseplan für {mensa_name} nicht laden: {e}")
+        return False
+    
+    report_page_load(driver, mensa_name)
+    return True
+
+def trigger_day(driver, date_str, limiter=None):
+    """Stößt den Tageswechsel an und gibt den Startzeitpunkt für die Wartezeit zurück"""
+    if limiter:
+        limiter.acquire()
+    driver.execute_script(TRIGGER_DAY_JS, date_str)
+    return time.perf_counter()
+
+def wait_for_day(driver, started, timeout=DAY_TIMEOUT):
+    """Wartet, bis der Speiseplan des neuen Tages geladen ist, und gibt die Wartezeit in s zurück
+    
+    Bei Timeout wird eine TimeoutException geworfen, statt veralteten Inhalt zu parsen.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    
+    WebDriverWait(driver, timeout, poll_frequency=DAY_POLL_INTERVAL).until(
+        lambda d: d.execute_script(DAY_READY_JS)
+    )
+    return time.perf_counter() - started
+
+def read_speiseplan(driver):
+    """Liest nur das Speiseplan-Fragment des aktuellen Tabs aus"""
+    return driver.execute_script(SPEISEPLAN_FRAGMENT_JS)
+
+def print_wait_stats(mensa_name, waits):
+    """Gibt die Verteilung der Wartezeiten pro Tag aus"""
+    if not waits:
+        return
+    waits = sorted(waits)
+    p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))]
+    print(f"  ⏱️  {mensa_name} Wartezeit pro Tag: min {waits[0]:.2f}s, "
+          f"median {statistics.median(waits):.2f}s, p95 {p95:.2f}s, max {waits[-1]:.2f}s")
+
+def scrape_mensa(driver, url, mensa_name, days=14, day_timeout=DAY_TIMEOUT, dates=None, failed=None, limiter=None,
+                 parse_pool=None, checkpoint=None, skipped=None):
+    """Scrapt Speiseplan einer Mensa für die nächsten 'days' Tage - nur Kategorien Aktionen und Essen
+    
+    Mit 'dates' lassen sich gezielt einzelne Tage scrapen; fehlgeschlagene Tage landen in 'failed',
+    Tage, die die Tagesnavigation nicht anbietet, mit Grund in 'skipped'.
+    Mit 'parse_pool' lädt Chrome schon den nächsten Tag, während der vorige geparst wird.
+    """
+    from selenium.common.exceptions import TimeoutException
+    
+    print(f"\n🍽️  Scrape {mensa_name}...")
+    dates = day_range(days) if dates is None else dates
+    failed = [] if failed is None else failed
+    
+    if not open_mensa(driver, url, mensa_name, limiter):
+        failed.extend(dates)
         return {}
     
-    heute = datetime.today()
-    speiseplan = {}
+    skipped = {} if skipped is None else skipped
+    dates = skip_by_navigation(mensa_name, dates, driver.execute_script(mensa_calendar.NAV_DATES_JS), skipped)
     
-    for day_offset in range(days):
-        aktuelles_datum = heute + timedelta(days=day_offset)
-        date_str = aktuelles_datum.strftime('%Y-%m-%d')
-        
+    pipeline = ParsePipeline(parse_pool, mensa_name, {}, failed, checkpoint=checkpoint)
+    waits = []
+    
+    for date_str in dates:
         try:
-            driver.execute_script(f"loadSpeiseplanWochentag('{date_str}');")
-            time.sleep(0.8)  # Kurze Pause für Content-Update
-            
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            
-            # Nur Kategorien "Aktionen" und "Essen" extrahieren
-            gerichte_kategorien = {'Aktionen': [], 'Essen': []}
-            
-            # Finde alle splGroupWrapper divs
-            group_wrappers = soup.find_all("div", class_="splGroupWrapper")
-            
-            for wrapper in group_wrappers:
-                # Kategorie-Name finden
-                group_div = wrapper.find("div", class_="splGroup")
-                if group_div:
-                    kategorie = group_div.text.strip()
-                    
-                    # Nur wenn Kategorie Aktionen oder Essen ist
-                    if kategorie in ['Aktionen', 'Essen']:
-                        # Alle Gerichte in dieser Kategorie finden
-                        meals = wrapper.find_all("div", class_="splMeal")
-                        for meal in meals:
-                            gericht_span = meal.find("span", class_="bold")
-                            if gericht_span:
-                                gericht_name = gericht_span.text.strip()
-                                
-                                # Preis extrahieren (im Format "€ 3,65/7,30/8,40")
-                                preis = ""
-                                preis_div = meal.find("div", class_="text-right")
-                                if preis_div:
-                                    preis_text = preis_div.get_text(strip=True)
-                                    if '€' in preis_text:
-                                        preis = preis_text.split('\n')[0].strip()
-                                
-                                gerichte_kategorien[kategorie].append({
-                                    'name': gericht_name,
-                                    'preis': preis
-                                })
+            with METRICS.span("day.load", mensa_name, date=date_str):
+                started = trigger_day(driver, date_str, limiter)
+                waits.append(wait_for_day(driver, started, day_timeout))
+                fragment = read_speiseplan(driver)
             
-            # Nur speichern wenn mindestens ein Gericht gefunden wurde
-            if gerichte_kategorien['Aktionen'] or gerichte_kategorien['Essen']:
-                speiseplan[date_str] = gerichte_kategorien
-                total = len(gerichte_kategorien['Aktionen']) + len(gerichte_kategorien['Essen'])
-                print(f"  ✓ {date_str}: {total} Gerichte (Aktionen: {len(gerichte_kategorien['Aktionen'])}, Essen: {len(gerichte_kategorien['Essen'])})")
-            else:
-                print(f"  - {date_str}: Keine Gerichte")
+            pipeline.submit(date_str, fragment)
                 
+        except TimeoutException:
+            print(f"  ❌ {mensa_name} - Timeout bei {date_str} nach {day_timeout}s, Tag übersprungen")
+            failed.append(date_str)
         except Exception as e:
-            print(f"  ❌ Fehler bei {date_str}: {str(e)}")
+            print(f"  ❌ {mensa_name} - Fehler bei {date_str}: {str(e)}")
+            failed.append(date_str)
     
+    speiseplan = pipeline.finish()
+    print_wait_stats(mensa_name, waits)
     return speiseplan
 
-def generate_html(all_data):
-    """Generiert HTML-Seite als Tabelle mit Suchfunktion"""
-    now = datetime.now().strftime('%d.%m.%Y %H:%M')
+def scrape_mensen_tabs(driver, mensen, plans, day_timeout=DAY_TIMEOUT, failures=None, limiter=None, parse_pool=None,
+                       blocked_urls=None, checkpoint=None, skipped=None):
+    """Scrapt mehrere Mensen in Tabs eines einzigen Chrome
     
-    # Sammle alle Daten nach Datum organisiert
-    dates_data = {}
-    total_dishes = 0
-    bratwurst_count = 0
+    Pro Tag wird loadSpeiseplanWochentag() erst in allen Tabs angestoßen und danach
+    reihum gewartet - die Ladezeiten der Tabs überlappen sich also.
+    'plans' gibt pro Mensa die zu scrapenden Tage an.
+    Die "scrape"-Spanne einer Mensa setzt sich aus ihren eigenen Abschnitten zusammen
+    (Seitenaufruf, Anstoßen und Warten pro Tag), damit day_costs_from_metrics() auch
+    für diesen Modus Kosten pro Tag bekommt.
+    """
+    from selenium.common.exceptions import TimeoutException
     
-    for mensa_name, dates in all_data.items():
-        for date_str, kategorien in dates.items():
-            if date_str not in dates_data:
-                dates_data[date_str] = {}
-            
-            dates_data[date_str][mensa_name] = kategorien
-            
-            # Statistiken
-            total_dishes += len(kategorien['Aktionen']) + len(kategorien['Essen'])
-            
-            # Bratwurst zählen
-            all_gerichte = kategorien['Aktionen'] + kategorien['Essen']
-            for gericht in all_gerichte:
-                # Unterstütze beide Formate: dict und string
-                gericht_name = gericht['name'] if isinstance(gericht, dict) else gericht
-                if 'bratwurst' in gericht_name.lower():
-                    bratwurst_count += 1
-    
-    total_days = len(dates_data)
-    mensen_namen = sorted(all_data.keys())
+    pipelines = {}
+    tabs = {}
+    waits = {mensa_name: [] for mensa_name in mensen}
+    failures = {} if failures is None else failures
+    skipped = {} if skipped is None else skipped
+    plans = dict(plans)
     
-    html = f"""<!DOCTYPE html>
-<html lang="de">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>🌭 Bratwurst Frühwarnsystem</title>
-    <style>
-        * {{
+    for mensa_name, url in mensen.items():
+        if tabs:
+            driver.switch_to.new_window('tab')
+            block_requests(driver, blocked_urls)
+        print(f"\n🍽️  Scrape {mensa_name} (Tab)...")
+        pipelines[mensa_name] = ParsePipeline(parse_pool, mensa_name, {}, failures.setdefault(mensa_name, []),
+                                              checkpoint=checkpoint)
+        with METRICS.span("scrape", mensa_name):
+            opened = open_mensa(driver, url, mensa_name, limiter)
+            if opened:
+                plans[mensa_name] = skip_by_navigation(mensa_name, plans[mensa_name],
+                                                       driver.execute_script(mensa_calendar.NAV_DATES_JS),
+                                                       skipped.setdefault(mensa_name, {}))
+        if opened:
+            tabs[mensa_name] = driver.current_window_handle
+        else:
+            failures[mensa_name].extend(plans[mensa_name])
+            # Neu geöffneten Tab wieder schließen - der erste Tab gehört dem Driver und bleibt
+            if tabs:
+                driver.close()
+                driver.switch_to.window(next(iter(tabs.values())))
+    
+    for date_str in sorted({d for mensa_name in tabs for d in plans[mensa_name]}):
+        started = {}
+        for mensa_name, handle in tabs.items():
+            if date_str not in plans[mensa_name]:
+                continue
+            try:
+                with METRICS.span("scrape", mensa_name):
+                    driver.switch_to.window(handle)
+                    started[mensa_name] = trigger_day(driver, date_str, limiter)
+            except Exception as e:
+                print(f"  ❌ {mensa_name} - Fehler bei {date_str}: {str(e)}")
+                failures[mensa_name].append(date_str)
+        
+        for mensa_name, handle in tabs.items():
+            if mensa_name not in started:
+                continue
+            try:
+                with METRICS.span("scrape", mensa_name):
+                    driver.switch_to.window(handle)
+                    with METRICS.span("day.load", mensa_name, date=date_str):
+                        waits[mensa_name].append(wait_for_day(driver, started[mensa_name], day_timeout))
+                        fragment = read_speiseplan(driver)
+                pipelines[mensa_name].submit(date_str, fragment)
+            except TimeoutException:
+                print(f"  ❌ {mensa_name} - Timeout bei {date_str} nach {day_timeout}s, Tag übersprungen")
+                failures[mensa_name].append(date_str)
+            except Exception as e:
+                print(f"  ❌ {mensa_name} - Fehler bei {date_str}: {str(e)}")
+                failures[mensa_name].append(date_str)
+    
+    results = {mensa_name: pipeline.finish() for mensa_name, pipeline in pipelines.items()}
+    for mensa_name in tabs:
+        print_wait_stats(mensa_name, waits[mensa_name])
+    
+    # Überzählige Tabs schließen, damit der Driver für den nächsten Batch sauber ist
+    for handle in list(tabs.values())[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    if tabs:
+        driver.switch_to.window(next(iter(tabs.values())))
+    
+    return results
+
+def pool_size(workers, pool, memory_budget_mb):
+    """Begrenzt die Worker-Anzahl so, dass der geschätzte Speicherbedarf ins Budget passt"""
+    cost_mb = TAB_MEMORY_MB if pool == "tabs" else CHROME_MEMORY_MB
+    return max(1, min(workers, memory_budget_mb // cost_mb))
+
+def scrape_all(mensen, days=14, backend="http", workers=3, pool="drivers", memory_budget_mb=MEMORY_BUDGET_MB,
+               day_timeout=DAY_TIMEOUT, plans=None, failures=None, priorities=None, day_costs=None,
+               rate=REQUESTS_PER_SECOND, parse_workers=PARSE_WORKERS, blocked_urls=None, checkpoint=None,
+               skipped=None):
+    """Scrapt alle Mensen parallel und gibt die Ergebnisse im all_data-Format zurück
+    
+    pool="drivers": jeder Worker-Thread hat eigenen Chrome-Prozess bzw. eigene HTTP-Session
+    pool="tabs": ein Chrome, mehrere Mensen gleichzeitig in eigenen Tabs
+    'plans' legt pro Mensa die Tage fest (Standard: die nächsten 'days' Tage),
+    fehlgeschlagene Tage werden pro Mensa in 'failures' gesammelt.
+    Die Mensen werden per schedule() verteilt, alle Worker teilen sich 'rate' Requests/s.
+    Geparst wird in einem gemeinsamen Pool mit 'parse_workers' Threads (0: im Worker selbst).
+    Chrome fragt URLs, die auf 'blocked_urls' passen, gar nicht erst an.
+    Jeder fertige Tag wird sofort in 'checkpoint' festgehalten (falls übergeben),
+    Tage, die laut Tagesnavigation nicht angeboten werden, landen pro Mensa in 'skipped'.
+    """
+    if plans is None:
+        plans = {mensa_name: day_range(days) for mensa_name in mensen}
+    failures = {} if failures is None else failures
+    skipped = {} if skipped is None else skipped
+    size = pool_size(workers, pool, memory_budget_mb)
+    limiter = RateLimiter(rate)
+    order = schedule(plans, priorities, day_costs)
+    print(f"👷 {size} Worker ({pool}, Budget {memory_budget_mb} MB, "
+          f"{f'{rate:g} Requests/s' if rate > 0 else 'ohne Rate-Limit'})")
+    print(f"📅 Geschätzte Laufzeit: {estimate_runtime(order, plans, size, rate, day_costs):.0f}s "
+          f"für {sum(len(plans[name]) for name in order)} Tage in {len(order)} Mensen")
+    
+    parse_pool = None
+    if parse_workers > 0:
+        parse_pool = ThreadPoolExecutor(max_workers=parse_workers, thread_name_prefix="parse")
+    try:
+        return scrape_pool(mensen, order, plans, failures, backend, pool, size, day_timeout, limiter, parse_pool,
+                           blocked_urls, checkpoint, skipped)
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown()
+
+def scrape_pool(mensen, order, plans, failures, backend, pool, size, day_timeout, limiter, parse_pool, blocked_urls,
+                checkpoint, skipped):
+    """Arbeitet 'order' mit 'size' Workern ab - siehe scrape_all()"""
+    if pool == "tabs" and backend == "chrome":
+        driver = setup_driver(blocked_urls)
+        all_data = {}
+        try:
+            for i in range(0, len(order), size):
+                batch = {name: mensen[name] for name in order[i:i + size]}
+                all_data.update(scrape_mensen_tabs(driver, batch, plans, day_timeout=day_timeout, failures=failures,
+                                                   limiter=limiter, parse_pool=parse_pool, blocked_urls=blocked_urls,
+                                                   checkpoint=checkpoint, skipped=skipped))
+        finally:
+            driver.quit()
+        return {name: all_data.get(name, {}) for name in mensen}
+    
+    local = threading.local()
+    drivers = []
+    sessions = []
+    lock = threading.Lock()
+    
+    def get_driver():
+        # Chrome pro Worker nur starten, wenn er wirklich gebraucht wird
+        if getattr(local, "driver", None) is None:
+            local.driver = setup_driver(blocked_urls)
+            with lock:
+                drivers.append(local.driver)
+        return local.driver
+    
+    def get_session():
+        if getattr(local, "session", None) is None:
+            local.session = setup_session()
+            with lock:
+                sessions.append(local.session)
+        return local.session
+    
+    def scrape_one(mensa_name, url):
+        speiseplan = None
+        failed = failures.setdefault(mensa_name, [])
+        mensa_skipped = skipped.setdefault(mensa_name, {})
+        with METRICS.span("scrape", mensa_name):
+            if backend == "http":
+                speiseplan = scrape_mensa_http(get_session(), url, mensa_name, dates=plans[mensa_name], failed=failed,
+                                               limiter=limiter, parse_pool=parse_pool, checkpoint=checkpoint,
+                                               skipped=mensa_skipped)
+            if speiseplan is None:
+                speiseplan = scrape_mensa(get_driver(), url, mensa_name, day_timeout=day_timeout,
+                                          dates=plans[mensa_name], failed=failed, limiter=limiter,
+                                          parse_pool=parse_pool, checkpoint=checkpoint, skipped=mensa_skipped)
+        return speiseplan
+    
+    try:
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            # Mensen ohne zu scrapende Tage gar nicht erst anfassen, der Rest in Schedule-Reihenfolge
+            futures = {name: executor.submit(scrape_one, name, mensen[name]) for name in order}
+            # Reihenfolge der Registry beibehalten
+            all_data = {}
+            for mensa_name in mensen:
+                if mensa_name not in futures:
+                    all_data[mensa_name] = {}
+                    continue
+                try:
+                    all_data[mensa_name] = futures[mensa_name].result()
+                except Exception as e:
+                    print(f"❌ {mensa_name} fehlgeschlagen: {e}")
+                    all_data[mensa_name] = {}
+                    failures[mensa_name] = list(plans[mensa_name])
+    finally:
+        for driver in drivers:
+            driver.quit()
+        for session in sessions:
+            session.close()
+    
+    return all_data
+
+def load_json(path, default):
+    """Lädt eine JSON-Datei aus einem früheren Lauf, falls vorhanden"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def is_sampled(mensa_name, date_str, today_str, sample_rate):
+    """Deterministische Stichprobe: gleiche Auswahl bei mehreren Läufen am selben Tag"""
+    digest = hashlib.sha1(f"{mensa_name}|{date_str}|{today_str}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") / 2**32 < sample_rate
+
+def max_age(entry, max_age_days=MAX_AGE_DAYS):
+    """Höchstalter eines Tages in Tagen - länger, je öfter sein Hash beim Re-Scrape gleich blieb"""
+    stretched = max_age_days * (1 + entry.get("stable", 0))
+    return min(stretched, max(max_age_days, STABLE_MAX_AGE_DAYS))
+
+def plan_incremental(mensa_name, dates, state, refresh_days=REFRESH_DAYS, sample_rate=SAMPLE_RATE,
+                     max_age_days=MAX_AGE_DAYS):
+    """Wählt die Tage aus, die neu gescrapt werden müssen
+    
+    Immer: die nächsten 'refresh_days' Kalendertage ab heute (auch wenn 'dates' schon um
+    Feiertage und Wochenenden gekürzt ist), unbekannte oder nie gescrapte Tage und Tage, deren
+    letzter Scrape älter als ihr max_age() ist - Tage mit stabilem Hash dürfen älter werden.
+    Vom Rest wird ein Anteil 'sample_rate' zufällig aufgefrischt.
+    """
+    today = datetime.today().date()
+    today_str = today.strftime('%Y-%m-%d')
+    known = state.get(mensa_name, {})
+    to_scrape = []
+    
+    for date_str in dates:
+        entry = known.get(date_str)
+        day_offset = (datetime.strptime(date_str, '%Y-%m-%d').date() - today).days
+        if day_offset < refresh_days or entry is None or "scraped" not in entry:
+            to_scrape.append(date_str)
+            continue
+        scraped = datetime.strptime(entry["scraped"], '%Y-%m-%d').date()
+        if (today - scraped).days >= max_age(entry, max_age_days) or is_sampled(mensa_name, date_str, today_str,
+                                                                                  sample_rate):
+            to_scrape.append(date_str)
+    
+    return to_scrape
+
+def merge_incremental(horizons, plans, results, failures, previous, state):
+    """Führt frische Ergebnisse mit wiederverwendeten Tagen aus dem letzten Lauf zusammen
+    
+    'horizons' enthält pro Mensa die gültigen Tage. Gibt (all_data, state) zurück;
+    Tage außerhalb des Horizonts (Vergangenheit) fallen heraus. Im State zählt "stable",
+    an wie vielen Tagen hintereinander ein Re-Scrape denselben Hash ergab.
+    """
+    today_str = datetime.today().strftime('%Y-%m-%d')
+    all_data = {}
+    new_state = {}
+    
+    for mensa_name, planned in plans.items():
+        scraped = set(planned) - set(failures.get(mensa_name, []))
+        old_days = previous.get(mensa_name, {})
+        old_state = state.get(mensa_name, {})
+        speiseplan = {}
+        mensa_state = {}
+        
+        for date_str in horizons[mensa_name]:
+            if date_str in scraped:
+                day = results.get(mensa_name, {}).get(date_str)
+                mensa_state[date_str] = {"hash": day_hash(day), "scraped": today_str, "stable": 0}
+                old_entry = old_state.get(date_str)
+                if old_entry is not None and old_entry["hash"] == mensa_state[date_str]["hash"]:
+                    # Mehrere Scrapes am selben Tag (Daemon) zählen nur einmal
+                    mensa_state[date_str]["stable"] = (old_entry.get("stable", 0)
+                                                       + (old_entry.get("scraped") != today_str))
+            elif date_str in old_state or date_str in old_days:
+                # Wiederverwenden - auch wenn der Scrape heute fehlgeschlagen ist
+                day = old_days.get(date_str)
+                if date_str in old_state:
+                    mensa_state[date_str] = old_state[date_str]
+                else:
+                    # Heute nicht geholt: ohne "scraped" plant der nächste Lauf den Tag sofort ein
+                    mensa_state[date_str] = {"hash": day_hash(day)}
+            else:
+                continue
+            if day is not None:
+                speiseplan[date_str] = day
+        
+        all_data[mensa_name] = speiseplan
+        new_state[mensa_name] = mensa_state
+    
+    return all_data, new_state
+
+def drop_past_days(all_data, horizons):
+    """Tage vor dem Horizont fallen wie in merge_incremental() heraus - nur bei den gescrapten Mensen
+    
+    Sonst meldet der Vergleich mit dem letzten Lauf jeden Tag den verstrichenen Vortag als Änderung.
+    """
+    trimmed = dict(all_data)
+    for mensa_name, horizon in horizons.items():
+        if mensa_name in all_data and horizon:
+            first = min(horizon)
+            trimmed[mensa_name] = {date_str: day for date_str, day in all_data[mensa_name].items() if date_str >= first}
+    return trimmed
+
+# HTML-Templates, einmalig vorbereitet und im Render-Loop nur noch befüllt
+WRITE_BUFFER_SIZE = 1 << 16
+
+PAGE_CSS = """        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
             padding: 20px;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 95%;
             margin: 0 auto;
             background: white;
             border-radius: 20px;
             box-shadow: 0 20px 60px rgba(0,0,0,0.3);
             overflow: hidden;
-        }}
+        }
         
-        header {{
+        header {
             background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
             padding: 40px;
             text-align: center;
             color: white;
-        }}
+        }
         
-        h1 {{
+        h1 {
             font-size: 2.5em;
             margin-bottom: 10px;
             text-shadow: 2px 2px 4px rgba(0,0,0,0.2);
-        }}
+        }
         
-        .subtitle {{
+        .subtitle {
             font-size: 1em;
             opacity: 0.95;
-        }}
+        }
         
-        .search-box {{
+        .search-box {
             padding: 20px;
             background: #f8f9fa;
             border-bottom: 2px solid #e9ecef;
-        }}
+        }
         
-        .search-container {{
+        .search-container {
             max-width: 600px;
             margin: 0 auto;
             position: relative;
-        }}
+        }
         
-        #searchInput {{
+        #searchInput {
             width: 100%;
             padding: 12px 45px 12px 15px;
             font-size: 16px;
@@ -221,27 +1069,27 @@ def generate_html(all_data):
             border-radius: 50px;
             outline: none;
             transition: all 0.3s;
-        }}
+        }
         
-        #searchInput:focus {{
+        #searchInput:focus {
             border-color: #667eea;
             box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-        }}
+        }
         
-        .search-icon {{
+        .search-icon {
             position: absolute;
             right: 18px;
             top: 50%;
             transform: translateY(-50%);
             font-size: 18px;
-        }}
+        }
         
-        .content {{
+        .content {
             padding: 20px;
             overflow-x: auto;
-        }}
+        }
         
-        .stats {{
+        .stats {
             display: flex;
             justify-content: space-around;
             padding: 15px;
@@ -250,37 +1098,37 @@ def generate_html(all_data):
             margin-bottom: 20px;
             flex-wrap: wrap;
             gap: 15px;
-        }}
+        }
         
-        .stat-item {{
+        .stat-item {
             text-align: center;
-        }}
+        }
         
-        .stat-number {{
+        .stat-number {
             font-size: 2em;
             font-weight: bold;
             color: #667eea;
-        }}
+        }
         
-        .stat-label {{
+        .stat-label {
             color: #6c757d;
             margin-top: 5px;
             font-size: 0.9em;
-        }}
+        }
         
-        .table-wrapper {{
+        .table-wrapper {
             overflow-x: auto;
             margin-top: 20px;
-        }}
+        }
         
-        table {{
+        table {
             width: 100%;
             border-collapse: collapse;
             font-size: 14px;
             min-width: 800px;
-        }}
+        }
         
-        th {{
+        th {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 12px 8px;
@@ -289,56 +1137,56 @@ def generate_html(all_data):
             position: sticky;
             top: 0;
             z-index: 10;
-        }}
+        }
         
-        th:first-child {{
+        th:first-child {
             border-radius: 8px 0 0 0;
-        }}
+        }
         
-        th:last-child {{
+        th:last-child {
             border-radius: 0 8px 0 0;
-        }}
+        }
         
-        td {{
+        td {
             padding: 10px 8px;
             border-bottom: 1px solid #e9ecef;
             vertical-align: top;
-        }}
+        }
         
-        tr:hover {{
+        tr:hover {
             background: #f8f9fa;
-        }}
+        }
         
-        tr.hidden {{
+        tr.hidden {
             display: none;
-        }}
+        }
         
-        .date-cell {{
+        .date-cell {
             font-weight: bold;
             color: #495057;
             white-space: nowrap;
             min-width: 120px;
-        }}
+        }
         
-        .weekday {{
+        .weekday {
             color: #667eea;
             display: block;
             font-size: 0.9em;
-        }}
+        }
         
-        .mensa-cell {{
+        .mensa-cell {
             padding: 8px;
-        }}
+        }
         
-        .kategorie-title {{
+        .kategorie-title {
             font-weight: bold;
             color: #667eea;
             font-size: 0.85em;
             margin-bottom: 5px;
             text-transform: uppercase;
-        }}
+        }
         
-        .dish {{
+        .dish {
             padding: 6px 8px;
             margin: 4px 0;
             background: #f8f9fa;
@@ -346,71 +1194,388 @@ def generate_html(all_data):
             border-left: 3px solid #667eea;
             font-size: 0.95em;
             line-height: 1.3;
-        }}
+        }
         
-        .dish .price {{
+        .dish .price {
             float: right;
             color: #a3a3a3;
             font-weight: bold;
             font-size: 0.85em;
             margin-left: 8px;
-        }}
+        }
         
-        .dish.bratwurst {{
+        .dish.cheapest .price {
+            color: #28a745;
+        }
+        
+        .dish.bratwurst {
             background: #fff3cd;
             border-left-color: #ff6b6b;
             font-weight: bold;
-        }}
+        }
         
-        .dish.bratwurst::before {{
+        .dish.bratwurst::before {
             content: '🌭 ';
-        }}
+        }
         
-        .dish.highlight-search {{
+        .dish.highlight-search {
             background: #d4edda;
             border-left-color: #28a745;
             font-weight: bold;
             box-shadow: 0 2px 8px rgba(40, 167, 69, 0.3);
             transform: scale(1.02);
             transition: all 0.3s;
-        }}
+        }
         
-        .dish.bratwurst.highlight-search {{
+        .dish.bratwurst.highlight-search {
             background: #ffeb3b;
             border-left-color: #ff6b6b;
             box-shadow: 0 2px 8px rgba(255, 107, 107, 0.4);
-        }}
+        }
         
-        .empty-cell {{
+        .empty-cell {
             color: #adb5bd;
             font-style: italic;
             text-align: center;
-        }}
+        }
         
-        footer {{
+        footer {
             background: #343a40;
             color: white;
             text-align: center;
             padding: 15px;
             font-size: 0.85em;
-        }}
+        }
         
-        .no-results {{
+        .no-results {
             text-align: center;
             padding: 40px;
             color: #6c757d;
             font-size: 1.2em;
             display: none;
-        }}
-        
-        @media (max-width: 768px) {{
-            h1 {{ font-size: 1.8em; }}
-            .stat-number {{ font-size: 1.5em; }}
-            table {{ font-size: 12px; }}
-            th, td {{ padding: 8px 5px; }}
-        }}
-    </style>
-</head>
+        }
+        
+        @media (max-width: 768px) {
+            h1 { font-size: 1.8em; }
+            .stat-number { font-size: 1.5em; }
+            table { font-size: 12px; }
+            th, td { padding: 8px 5px; }
+        }
+"""
+
+SEARCH_CORE_JS = r"""        // Suche über den vorberechneten Index statt über den DOM
+        const searchInput = document.getElementById('searchInput');
+        const noResults = document.getElementById('noResults');
+        const tableWrapper = document.querySelector('.table-wrapper');
+        const SEARCH_DEBOUNCE_MS = 120;
+        
+        // Gleiche Normalisierung wie mensa_model.fold_text(): Kleinschreibung, Umlaute falten
+        function foldText(text) {
+            return text.toLowerCase().normalize('NFD').replace(/[\u0300-\u036f]/g, '').replace(/ß/g, 'ss');
+        }
+        
+        function searchWords(query) {
+            return foldText(query).match(/[a-z0-9]+/g);
+        }
+        
+        // Liefert eine Suchfunktion: Query -> Set der passenden Gericht-IDs (null bei leerer Suche)
+        function createSearch(searchIndex) {
+            // Postings sind delta-kodiert; Suffix-Tabelle erst bei der ersten Suche aufbauen
+            let postings = null;
+            let suffixes = null;
+            
+            function prepareIndex() {
+                postings = searchIndex.postings.map(list => {
+                    let id = 0;
+                    return list.map(delta => id += delta);
+                });
+                // Jede Token-Endung zeigt auf ihr Token, damit "wurst" auch "bratwurst" findet
+                suffixes = [];
+                searchIndex.tokens.forEach((token, tokenId) => {
+                    for (let i = 0; i < token.length; i++) {
+                        suffixes.push([token.slice(i), tokenId]);
+                    }
+                });
+                suffixes.sort((a, b) => (a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : 0));
+            }
+            
+            // Alle Gerichte, deren Tokens 'word' enthalten (Binärsuche im Suffix-Array)
+            function matchWord(word) {
+                let lo = 0;
+                let hi = suffixes.length;
+                while (lo < hi) {
+                    const mid = (lo + hi) >> 1;
+                    if (suffixes[mid][0] < word) { lo = mid + 1; } else { hi = mid; }
+                }
+                const tokenIds = new Set();
+                for (let i = lo; i < suffixes.length && suffixes[i][0].startsWith(word); i++) {
+                    tokenIds.add(suffixes[i][1]);
+                }
+                const dishIds = new Set();
+                tokenIds.forEach(tokenId => postings[tokenId].forEach(dishId => dishIds.add(dishId)));
+                return dishIds;
+            }
+            
+            return function(query) {
+                const words = searchWords(query);
+                if (!words) {
+                    return null;
+                }
+                if (postings === null) {
+                    prepareIndex();
+                }
+                // Ein Gericht matcht, wenn es alle Suchwörter enthält
+                let matches = null;
+                words.forEach(word => {
+                    const found = matchWord(word);
+                    matches = matches === null ? found : new Set([...matches].filter(dishId => found.has(dishId)));
+                });
+                return matches;
+            };
+        }
+        
+        // Treffer highlighten und Zeilen ohne Treffer ausblenden; matches === null zeigt alles
+        let highlighted = [];
+        function applySearch(matches, dishes, rows, dishRows) {
+            // Entferne alle Highlights
+            highlighted.forEach(dishId => dishes[dishId].classList.remove('highlight-search'));
+            highlighted = [];
+            
+            let visibleRows = rows.length;
+            if (matches === null) {
+                // Keine Suche: Alle Zeilen anzeigen
+                rows.forEach(row => row.classList.remove('hidden'));
+            } else {
+                const matchedRows = new Set();
+                matches.forEach(dishId => {
+                    dishes[dishId].classList.add('highlight-search');
+                    matchedRows.add(dishRows[dishId]);
+                });
+                highlighted = [...matches];
+                
+                // Zeile nur anzeigen, wenn mindestens ein Gericht matched
+                rows.forEach((row, rowId) => row.classList.toggle('hidden', !matchedRows.has(rowId)));
+                visibleRows = matchedRows.size;
+            }
+            
+            if (visibleRows === 0) {
+                noResults.style.display = 'block';
+                tableWrapper.style.display = 'none';
+            } else {
+                noResults.style.display = 'none';
+                tableWrapper.style.display = 'block';
+            }
+        }
+        
+        // Debounce: erst suchen, wenn kurz nicht mehr getippt wird
+        function bindSearchInput(handler) {
+            let searchTimer = null;
+            searchInput.addEventListener('input', function() {
+                clearTimeout(searchTimer);
+                searchTimer = setTimeout(() => handler(this.value), SEARCH_DEBOUNCE_MS);
+            });
+            
+            // Enter-Taste
+            searchInput.addEventListener('keypress', function(e) {
+                if (e.key === 'Enter') {
+                    e.preventDefault();
+                }
+            });
+        }
+"""
+
+PAGE_SCRIPT = SEARCH_CORE_JS + r"""        
+        const searchIndex = JSON.parse(document.getElementById('searchIndex').textContent);
+        const search = createSearch(searchIndex);
+        const tableRows = document.querySelectorAll('#mensaTable tbody tr');
+        const allDishes = document.querySelectorAll('#mensaTable .dish');
+        
+        bindSearchInput(query => applySearch(search(query), allDishes, tableRows, searchIndex.rows));
+"""
+
+SHELL_SCRIPT = SEARCH_CORE_JS + r"""        
+        // Shell-Modus: Daten kommen wochenweise aus DATA_DIR, gerendert wird nur, was gebraucht wird
+        const DATA_DIR = 'data/';
+        const KATEGORIEN = ['Aktionen', 'Essen'];
+        const table = document.getElementById('mensaTable');
+        const headerRow = table.querySelector('thead tr');
+        const sentinel = document.createElement('div');
+        tableWrapper.after(sentinel);
+        
+        let manifest = null;
+        let nextWeek = 0;
+        let loadingWeek = null;
+        let searchIndex = null;
+        let search = null;
+        let searchActive = false;
+        const weekBodies = [];
+        const collapsedWeeks = new Map();
+        
+        function escapeHtml(text) {
+            return text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+        }
+        
+        function renderDish(name, preis, tags, cheapest) {
+            let cssClass = tags && tags.includes('bratwurst') ? 'dish bratwurst' : 'dish';
+            if (cheapest) {
+                cssClass += ' cheapest';
+            }
+            const price = preis ? ` <span class="price">${escapeHtml(preis)}</span>` : '';
+            return `<div class="${cssClass}">${escapeHtml(name)}${price}</div>`;
+        }
+        
+        // Zeile: [Datum, Wochentag, Zellen]; Zelle: null oder [Aktionen, Essen] mit [Name, Preis, Tags?, günstigstes?]
+        function renderRow(row) {
+            let html = `<td class="date-cell"><span class="weekday">${row[1]}</span>${row[0]}</td>`;
+            row[2].forEach(cell => {
+                if (cell === null) {
+                    html += '<td class="empty-cell">-</td>';
+                    return;
+                }
+                html += '<td class="mensa-cell">';
+                cell.forEach((gerichte, i) => {
+                    if (gerichte.length) {
+                        const style = i > 0 ? ' style="margin-top: 8px;"' : '';
+                        html += `<div class="kategorie-title"${style}>${KATEGORIEN[i]}</div>`;
+                        gerichte.forEach(([name, preis, tags, cheapest]) => {
+                            html += renderDish(name, preis, tags, cheapest);
+                        });
+                    }
+                });
+                html += '</td>';
+            });
+            return `<tr>${html}</tr>`;
+        }
+        
+        function loadNextWeek() {
+            if (loadingWeek) {
+                return loadingWeek;
+            }
+            if (nextWeek >= manifest.weeks.length) {
+                return Promise.resolve(false);
+            }
+            const week = manifest.weeks[nextWeek++];
+            loadingWeek = fetch(DATA_DIR + week.file)
+                .then(response => response.json())
+                .then(rows => {
+                    const tbody = document.createElement('tbody');
+                    tbody.className = 'week';
+                    tbody.innerHTML = rows.map(renderRow).join('');
+                    table.appendChild(tbody);
+                    weekBodies.push(tbody);
+                    weekObserver.observe(tbody);
+                    loadingWeek = null;
+                    return true;
+                });
+            return loadingWeek;
+        }
+        
+        function loadAllWeeks() {
+            return loadNextWeek().then(more => (more ? loadAllWeeks() : undefined));
+        }
+        
+        // Weitere Wochen nachladen, solange das Tabellenende in Sichtweite ist
+        function fillViewport() {
+            if (sentinel.getBoundingClientRect().top < window.innerHeight * 2) {
+                loadNextWeek().then(more => { if (more) { fillViewport(); } });
+            }
+        }
+        
+        // Virtualisierung: Wochen weit außerhalb des Viewports durch einen Platzhalter gleicher Höhe ersetzen
+        const weekObserver = new IntersectionObserver(entries => {
+            if (searchActive) {
+                return;
+            }
+            entries.forEach(entry => (entry.isIntersecting ? restoreWeek(entry.target) : collapseWeek(entry.target)));
+        }, { rootMargin: '1500px 0px' });
+        
+        function collapseWeek(tbody) {
+            if (collapsedWeeks.has(tbody)) {
+                return;
+            }
+            const height = tbody.getBoundingClientRect().height;
+            collapsedWeeks.set(tbody, tbody.innerHTML);
+            tbody.innerHTML = `<tr class="week-placeholder"><td colspan="${manifest.mensen.length + 1}" style="height: ${height}px"></td></tr>`;
+        }
+        
+        function restoreWeek(tbody) {
+            if (collapsedWeeks.has(tbody)) {
+                tbody.innerHTML = collapsedWeeks.get(tbody);
+                collapsedWeeks.delete(tbody);
+            }
+        }
+        
+        new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                fillViewport();
+            }
+        }, { rootMargin: '800px 0px' }).observe(sentinel);
+        
+        function loadSearchIndex() {
+            if (searchIndex) {
+                return Promise.resolve();
+            }
+            return fetch(DATA_DIR + manifest.search).then(response => response.json()).then(index => {
+                searchIndex = index;
+                search = createSearch(index);
+            });
+        }
+        
+        // Für die Suche müssen alle Wochen im DOM sein, da die Gericht-IDs der DOM-Reihenfolge folgen
+        bindSearchInput(query => {
+            if (!searchWords(query)) {
+                searchActive = false;
+                const rows = table.querySelectorAll('tbody tr');
+                applySearch(null, table.querySelectorAll('.dish'), rows, []);
+                // Virtualisierung wieder aufnehmen
+                weekBodies.forEach(tbody => { weekObserver.unobserve(tbody); weekObserver.observe(tbody); });
+                return;
+            }
+            searchActive = true;
+            Promise.all([loadAllWeeks(), loadSearchIndex()]).then(() => {
+                if (query !== searchInput.value) {
+                    return;
+                }
+                weekBodies.forEach(restoreWeek);
+                applySearch(search(query), table.querySelectorAll('.dish'),
+                            table.querySelectorAll('tbody.week tr'), searchIndex.rows);
+            });
+        });
+        
+        fetch(DATA_DIR + 'manifest.json')
+            .then(response => response.json())
+            .then(data => {
+                manifest = data;
+                document.getElementById('updated').textContent = manifest.updated;
+                const stats = document.querySelectorAll('.stat-number');
+                stats[0].textContent = manifest.stats.total_dishes;
+                stats[1].textContent = manifest.stats.total_days;
+                stats[2].textContent = manifest.stats.bratwurst_count;
+                manifest.stats.extra.forEach(([value, label]) => {
+                    const item = document.createElement('div');
+                    item.className = 'stat-item';
+                    item.innerHTML = '<div class="stat-number"></div><div class="stat-label"></div>';
+                    item.firstChild.textContent = value;
+                    item.lastChild.textContent = label;
+                    document.querySelector('.stats').appendChild(item);
+                });
+                manifest.mensen.forEach(mensa => {
+                    const th = document.createElement('th');
+                    th.textContent = mensa;
+                    headerRow.appendChild(th);
+                });
+                return loadNextWeek();
+            })
+            .then(fillViewport);
+"""
+
+PAGE_HEAD_HTML = """<!DOCTYPE html>
+<html lang="de">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>🌭 Bratwurst Frühwarnsystem</title>
+{styles}</head>
 <body>
     <div class="container">
         <header>
@@ -444,98 +1609,37 @@ def generate_html(all_data):
                     <div class="stat-number">{bratwurst_count}</div>
                     <div class="stat-label">🌭 Bratwürste</div>
                 </div>
-            </div>
+{extra_stats}            </div>
             
             <div class="table-wrapper">
                 <table id="mensaTable">
                     <thead>
                         <tr>
                             <th>Datum</th>
-"""
-    
-    # Spaltenüberschriften für Mensen
-    for mensa in mensen_namen:
-        html += f'                            <th>{mensa}</th>\n'
-    
-    html += """                        </tr>
+""".format
+STAT_ITEM_HTML = """                <div class="stat-item">
+                    <div class="stat-number">{count}</div>
+                    <div class="stat-label">{label}</div>
+                </div>
+""".format
+MENSA_TH_HTML = '                            <th>{}</th>\n'.format
+TABLE_BODY_START_HTML = """                        </tr>
                     </thead>
                     <tbody>
 """
-    
-    # Tabellen-Zeilen generieren
-    for date_str in sorted(dates_data.keys()):
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-        weekdays = ['Montag', 'Dienstag', 'Mittwoch', 'Donnerstag', 'Freitag', 'Samstag', 'Sonntag']
-        weekday = weekdays[date_obj.weekday()]
-        formatted_date = date_obj.strftime('%d.%m.%Y')
-        
-        # Sammle alle Gerichte dieser Zeile für die Suche
-        all_dishes_in_row = []
-        for mensa in mensen_namen:
-            if mensa in dates_data[date_str]:
-                kategorien = dates_data[date_str][mensa]
-                # Gerichte sind jetzt Dicts mit 'name' und 'preis'
-                all_dishes_in_row.extend([g['name'] if isinstance(g, dict) else g for g in kategorien['Aktionen']])
-                all_dishes_in_row.extend([g['name'] if isinstance(g, dict) else g for g in kategorien['Essen']])
-        
-        search_text = ' '.join(all_dishes_in_row).lower()
-        
-        html += f'                        <tr data-search="{search_text}">\n'
-        html += f'                            <td class="date-cell"><span class="weekday">{weekday}</span>{formatted_date}</td>\n'
-        
-        # Zellen für jede Mensa
-        for mensa in mensen_namen:
-            if mensa in dates_data[date_str]:
-                kategorien = dates_data[date_str][mensa]
-                html += '                            <td class="mensa-cell">\n'
-                
-                # Aktionen
-                if kategorien['Aktionen']:
-                    html += '                                <div class="kategorie-title">Aktionen</div>\n'
-                    for gericht in kategorien['Aktionen']:
-                        # Unterstütze beide Formate: dict und string
-                        if isinstance(gericht, dict):
-                            gericht_name = gericht['name']
-                            gericht_preis = gericht.get('preis', '')
-                        else:
-                            gericht_name = gericht
-                            gericht_preis = ''
-                        
-                        is_bratwurst = 'bratwurst' in gericht_name.lower()
-                        css_class = 'dish bratwurst' if is_bratwurst else 'dish'
-                        
-                        if gericht_preis:
-                            html += f'                                <div class="{css_class}">{gericht_name} <span class="price">{gericht_preis}</span></div>\n'
-                        else:
-                            html += f'                                <div class="{css_class}">{gericht_name}</div>\n'
-                
-                # Essen
-                if kategorien['Essen']:
-                    html += '                                <div class="kategorie-title" style="margin-top: 8px;">Essen</div>\n'
-                    for gericht in kategorien['Essen']:
-                        # Unterstütze beide Formate: dict und string
-                        if isinstance(gericht, dict):
-                            gericht_name = gericht['name']
-                            gericht_preis = gericht.get('preis', '')
-                        else:
-                            gericht_name = gericht
-                            gericht_preis = ''
-                        
-                        is_bratwurst = 'bratwurst' in gericht_name.lower()
-                        css_class = 'dish bratwurst' if is_bratwurst else 'dish'
-                        
-                        if gericht_preis:
-                            html += f'                                <div class="{css_class}">{gericht_name} <span class="price">{gericht_preis}</span></div>\n'
-                        else:
-                            html += f'                                <div class="{css_class}">{gericht_name}</div>\n'
-                
-                html += '                            </td>\n'
-            else:
-                html += '                            <td class="empty-cell">-</td>\n'
-        
-        html += '                        </tr>\n'
-    
-    html += """                    </tbody>
+ROW_START_HTML = ('                        <tr>\n'
+                  '                            <td class="date-cell"><span class="weekday">{weekday}</span>{date}</td>\n').format
+CELL_START_HTML = '                            <td class="mensa-cell">\n'
+CELL_END_HTML = '                            </td>\n'
+EMPTY_CELL_HTML = '                            <td class="empty-cell">-</td>\n'
+ROW_END_HTML = '                        </tr>\n'
+KATEGORIE_TITLE_HTML = {
+    'Aktionen': '                                <div class="kategorie-title">Aktionen</div>\n',
+    'Essen': '                                <div class="kategorie-title" style="margin-top: 8px;">Essen</div>\n',
+}
+DISH_HTML = '                                <div class="{}">{}</div>\n'.format
+DISH_WITH_PRICE_HTML = '                                <div class="{}">{} <span class="price">{}</span></div>\n'.format
+PAGE_FOOT_HTML = """                    </tbody>
                 </table>
             </div>
             
@@ -549,103 +1653,627 @@ def generate_html(all_data):
         </footer>
     </div>
     
-    <script>
-        // Suchfunktion mit Highlighting
-        const searchInput = document.getElementById('searchInput');
-        const tableRows = document.querySelectorAll('#mensaTable tbody tr');
-        const allDishes = document.querySelectorAll('.dish');
-        const noResults = document.getElementById('noResults');
-        const tableWrapper = document.querySelector('.table-wrapper');
+"""
+SEARCH_INDEX_HTML = '    <script id="searchIndex" type="application/json">{}</script>\n'.format
+STYLE_HTML = '    <style>\n{}    </style>\n'.format
+STYLESHEET_HTML = '    <link rel="stylesheet" href="{}">\n'.format
+SCRIPT_HTML = '    <script>\n{}    </script>\n'.format
+SCRIPT_SRC_HTML = '    <script src="{}"></script>\n'.format
+PAGE_END_HTML = """</body>
+</html>
+"""
+
+# Shell-Modus: statische Seite ohne Daten, Header und Statistiken füllt das Script
+SHELL_CSS = """        tr.week-placeholder td {
+            padding: 0;
+            border: 0;
+        }
+"""
+SPLIT_DATA_DIR = "data"
+# CSS und JS je Seitenvariante: inline oder als gehashte Dateien (siehe page_assets)
+PAGE_ASSETS = {
+    "page": (PAGE_CSS, PAGE_SCRIPT),
+    "shell": (PAGE_CSS + SHELL_CSS, SHELL_SCRIPT),
+}
+
+def enrich_data(all_data, matcher):
+    """{mensa: {datum: DayPlan}} -> Datensatz {mensa: MensaPlan}
+    
+    Gleiche Gerichte teilen sich ein Meal, klassifiziert wird jedes nur einmal.
+    """
+    return mensa_model.MealTable(matcher).dataset(all_data)
+
+def collect_dates(all_data):
+    """Organisiert den Datensatz nach Datum: {datum: {mensa: DayPlan}} plus Gericht- und Tag-Zähler"""
+    dates_data = {}
+    total_dishes = 0
+    tag_counts = Counter()
+    
+    for mensa_name, dates in all_data.items():
+        for date_str, day in dates.items():
+            for _, meals in day.kategorien():
+                for meal in meals:
+                    tag_counts.update(meal.tags)
+            total_dishes += day.dish_count
+            dates_data.setdefault(date_str, {})[mensa_name] = day
+    
+    return dates_data, total_dishes, tag_counts
+
+def extra_stat_items(tag_counts, price_summary):
+    """Zusätzliche Statistiken als (Wert, Label): Watchlist-Tags außer Bratwurst, Preise pro Mensa"""
+    items = [(count, tag.capitalize()) for tag, count in sorted(tag_counts.items()) if tag != 'bratwurst']
+    items += [(mensa_prices.format_euro(average), f"Ø {mensa_name} (Studierende)")
+              for mensa_name, average in sorted(price_summary['average'].items())]
+    items.append((len(price_summary['changes']), "Preisänderungen"))
+    return items
+
+def render_extra_stats(items):
+    return ''.join(STAT_ITEM_HTML(count=escape(str(value), quote=False), label=escape(label, quote=False))
+                   for value, label in items)
+
+def render_dish(meal, cheapest=False):
+    """Einheitlicher Render-Pfad für Gerichte aller Kategorien"""
+    css_class = 'dish bratwurst' if 'bratwurst' in meal.tags else 'dish'
+    if cheapest:
+        css_class += ' cheapest'
+    if meal.preis:
+        return DISH_WITH_PRICE_HTML(css_class, escape(meal.name, quote=False), escape(meal.preis, quote=False))
+    return DISH_HTML(css_class, escape(meal.name, quote=False))
+
+@lru_cache(maxsize=None)
+def page_assets(variant, external=False):
+    """Einbindung von CSS/JS einer Seitenvariante: (styles, script, {dateiname: bytes})
+    
+    Extern landen CSS und JS minifiziert unter assets/ mit Inhalts-Hash im Namen,
+    sonst stehen sie wie bisher inline in der Seite.
+    """
+    css, js = PAGE_ASSETS[variant]
+    if not external:
+        return STYLE_HTML(css), SCRIPT_HTML(js), {}
+    css_bytes = mensa_assets.minify_css(css).encode("utf-8")
+    js_bytes = mensa_assets.minify_js(js).encode("utf-8")
+    css_name = mensa_assets.hashed_name("style", "css", css_bytes)
+    js_name = mensa_assets.hashed_name(variant, "js", js_bytes)
+    return (STYLESHEET_HTML(f"{mensa_assets.ASSETS_DIR}/{css_name}"),
+            SCRIPT_SRC_HTML(f"{mensa_assets.ASSETS_DIR}/{js_name}"),
+            {css_name: css_bytes, js_name: js_bytes})
+
+def iter_html(all_data, assets=False):
+    """Erzeugt die HTML-Seite stückweise als Tabelle mit Suchfunktion
+    
+    Mit 'assets' werden CSS/JS nur referenziert (siehe page_assets).
+    """
+    now = datetime.now().strftime('%d.%m.%Y %H:%M')
+    styles, script, _ = page_assets("page", assets)
+    dates_data, total_dishes, tag_counts = collect_dates(all_data)
+    price_summary = mensa_prices.PriceTable.from_data(all_data).summarize()
+    cheapest = price_summary['cheapest']
+    mensen_namen = sorted(all_data.keys())
+    
+    yield PAGE_HEAD_HTML(styles=styles, now=now, total_dishes=total_dishes, total_days=len(dates_data),
+                         bratwurst_count=tag_counts['bratwurst'],
+                         extra_stats=render_extra_stats(extra_stat_items(tag_counts, price_summary)))
+    
+    # Spaltenüberschriften für Mensen
+    for mensa in mensen_namen:
+        yield MENSA_TH_HTML(escape(mensa, quote=False))
+    
+    yield TABLE_BODY_START_HTML
+    
+    # Tabellen-Zeilen generieren
+    search_index = mensa_search.SearchIndex()
+    for row_id, date_str in enumerate(sorted(dates_data.keys())):
+        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+        row_data = dates_data[date_str]
         
-        searchInput.addEventListener('input', function() {
-            const searchTerm = this.value.toLowerCase().trim();
-            let visibleRows = 0;
-            
-            // Entferne alle Highlights
-            allDishes.forEach(dish => {
-                dish.classList.remove('highlight-search');
-            });
-            
-            tableRows.forEach(row => {
-                if (searchTerm === '') {
-                    // Keine Suche: Alle Zeilen anzeigen
-                    row.classList.remove('hidden');
-                    visibleRows++;
-                } else {
-                    // Finde alle Gerichte in dieser Zeile
-                    const dishes = row.querySelectorAll('.dish');
-                    let hasMatch = false;
-                    
-                    dishes.forEach(dish => {
-                        const dishText = dish.textContent.toLowerCase();
-                        if (dishText.includes(searchTerm)) {
-                            // Gericht gefunden: highlighten
-                            dish.classList.add('highlight-search');
-                            hasMatch = true;
-                        }
-                    });
-                    
-                    // Zeile nur anzeigen, wenn mindestens ein Gericht matched
-                    if (hasMatch) {
-                        row.classList.remove('hidden');
-                        visibleRows++;
-                    } else {
-                        row.classList.add('hidden');
-                    }
-                }
-            });
+        yield ROW_START_HTML(weekday=mensa_calendar.WEEKDAY_NAMES[date_obj.weekday()],
+                             date=date_obj.strftime('%d.%m.%Y'))
+        
+        # Zellen für jede Mensa
+        for mensa in mensen_namen:
+            if mensa not in row_data:
+                yield EMPTY_CELL_HTML
+                continue
             
-            if (visibleRows === 0) {
-                noResults.style.display = 'block';
-                tableWrapper.style.display = 'none';
-            } else {
-                noResults.style.display = 'none';
-                tableWrapper.style.display = 'block';
-            }
-        });
+            yield CELL_START_HTML
+            cheapest_name = cheapest.get((date_str, mensa), (None,))[0]
+            for kategorie, meals in row_data[mensa].kategorien():
+                if meals:
+                    yield KATEGORIE_TITLE_HTML[kategorie]
+                    for meal in meals:
+                        # Gerichte werden in DOM-Reihenfolge nummeriert, Zeilen ebenso
+                        search_index.add(f"{meal.name} {meal.preis}", row_id)
+                        yield render_dish(meal, meal.name == cheapest_name)
+            yield CELL_END_HTML
         
-        // Enter-Taste
-        searchInput.addEventListener('keypress', function(e) {
-            if (e.key === 'Enter') {
-                e.preventDefault();
-            }
-        });
-    </script>
-</body>
-</html>
-"""
+        yield ROW_END_HTML
     
-    return html
+    yield PAGE_FOOT_HTML
+    yield SEARCH_INDEX_HTML(search_index.to_json())
+    yield script
+    yield PAGE_END_HTML
 
-def main():
-    print("🌭 Bratwurst Frühwarnsystem gestartet!")
-    print("=" * 60)
+def generate_html(all_data, assets=False):
+    """Generiert HTML-Seite als Tabelle mit Suchfunktion, mit 'assets' minifiziert und ohne Inline-CSS/JS"""
+    with METRICS.span("render"):
+        chunks = iter_html(all_data, assets)
+        return ''.join(mensa_assets.minify_markup(chunks) if assets else chunks)
+
+def write_atomic(path, chunks, binary=False):
+    """Schreibt Chunks gepuffert in eine Temp-Datei und ersetzt 'path' erst danach atomar
     
-    driver = setup_driver()
-    all_data = {}
+    Ein abgebrochener Lauf hinterlässt so nie eine halb geschriebene Datei.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", dir=directory)
+    try:
+        os.chmod(tmp_path, 0o644)
+        if binary:
+            f = os.fdopen(fd, "wb", buffering=WRITE_BUFFER_SIZE)
+        else:
+            f = os.fdopen(fd, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE)
+        # Beim Streamen enthält die Spanne auch das Erzeugen der Chunks
+        with METRICS.span("write", file=os.path.basename(path)), f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def write_html(all_data, path="index.html", assets=False):
+    """Rendert die HTML-Seite direkt in die Datei, ohne sie komplett im Speicher zu halten"""
+    chunks = iter_html(all_data, assets)
+    write_atomic(path, mensa_assets.minify_markup(chunks) if assets else chunks)
+
+def write_assets(files, directory=mensa_assets.ASSETS_DIR):
+    """Schreibt gehashte Asset-Dateien, entfernt Assets älterer Versionen und gibt die Pfade zurück"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for file_name, data in files.items():
+        path = os.path.join(directory, file_name)
+        # Gleicher Name heißt gleicher Inhalt - vorhandene Dateien bleiben unangetastet
+        if not os.path.exists(path):
+            write_atomic(path, [data], binary=True)
+        paths.append(path)
+    for file_name in os.listdir(directory):
+        if mensa_assets.uncompressed_name(file_name) not in files:
+            os.remove(os.path.join(directory, file_name))
+    return paths
+
+def write_precompressed(paths):
+    """Schreibt zu jedem Artefakt vorkomprimierte .gz- und (mit brotli) .br-Geschwister"""
+    with METRICS.span("compress"):
+        for path in paths:
+            with open(path, "rb") as f:
+                data = f.read()
+            for _, suffix, body in mensa_assets.compressed(data):
+                write_atomic(path + suffix, [body], binary=True)
+
+def write_json(path, data, compact=False):
+    """Schreibt JSON atomar und stückweise"""
+    if compact:
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    else:
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=2)
+    write_atomic(path, encoder.iterencode(data))
+
+def gzip_chunks(chunks):
+    """Komprimiert Text-Chunks stückweise zu gzip (ohne Zeitstempel, damit reproduzierbar)"""
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk.encode("utf-8"))
+    yield compressor.flush()
+
+def write_compact(path, all_data, gzipped=False):
+    """Schreibt den Datensatz im kompakten Format, optional zusätzlich vorkomprimiert als .gz"""
+    payload = mensa_compact.encode(all_data)
+    write_json(path, payload, compact=True)
+    if gzipped:
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+        write_atomic(path + ".gz", gzip_chunks(encoder.iterencode(payload)), binary=True)
+
+def load_data(path, default=None):
+    """Lädt einen Datensatz als {mensa: {datum: DayPlan}} - klassisches mensen_data.json oder
+    kompaktes Format, auch .gz
+    """
+    try:
+        if path.endswith(".gz"):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        else:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+    except (OSError, ValueError):
+        return default
+    if mensa_compact.is_compact(data):
+        return mensa_compact.decode(data)
+    return mensa_model.days_from_json(data)
+
+def week_id(date_str):
+    """ISO-Kalenderwoche eines Datums, z.B. '2026-W07'"""
+    year, week, _ = datetime.strptime(date_str, '%Y-%m-%d').isocalendar()
+    return f"{year}-W{week:02d}"
+
+def iter_shell_html(assets=False):
+    """Statische Shell für den Split-Modus - Inhalte kommen aus dem Daten-Verzeichnis"""
+    placeholder = '–'
+    styles, script, _ = page_assets("shell", assets)
+    yield PAGE_HEAD_HTML(styles=styles, now='<span id="updated">…</span>', total_dishes=placeholder,
+                         total_days=placeholder, bratwurst_count=placeholder, extra_stats='')
+    yield TABLE_BODY_START_HTML
+    yield PAGE_FOOT_HTML
+    yield script
+    yield PAGE_END_HTML
+
+def split_dish(meal, cheapest=False):
+    """Gericht im Wochen-Payload: [Name, Preis], Tags und Günstigstes-Flag nur wenn nötig"""
+    if cheapest:
+        return [meal.name, meal.preis, meal.tags, 1]
+    return [meal.name, meal.preis, meal.tags] if meal.tags else [meal.name, meal.preis]
+
+def write_split(all_data, html_path="index.html", data_dir=SPLIT_DATA_DIR, assets=False):
+    """Schreibt kompakte Wochen-Payloads, Manifest und Suchindex plus statische HTML-Shell
+    
+    Die Shell lädt nur die sichtbaren Wochen nach - Seitengewicht und DOM-Größe beim
+    ersten Rendern hängen damit nicht mehr vom Vorschau-Horizont ab.
+    """
+    dates_data, total_dishes, tag_counts = collect_dates(all_data)
+    price_summary = mensa_prices.PriceTable.from_data(all_data).summarize()
+    cheapest = price_summary['cheapest']
+    mensen_namen = sorted(all_data.keys())
+    os.makedirs(data_dir, exist_ok=True)
+    
+    weeks = {}
+    search_index = mensa_search.SearchIndex()
+    for row_id, date_str in enumerate(sorted(dates_data.keys())):
+        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+        row_data = dates_data[date_str]
+        cells = []
+        for mensa in mensen_namen:
+            if mensa not in row_data:
+                cells.append(None)
+                continue
+            cell = []
+            cheapest_name = cheapest.get((date_str, mensa), (None,))[0]
+            for _, meals in row_data[mensa].kategorien():
+                # Gleiche Reihenfolge wie im DOM der Shell, damit die Gericht-IDs passen
+                for meal in meals:
+                    search_index.add(f"{meal.name} {meal.preis}", row_id)
+                cell.append([split_dish(meal, meal.name == cheapest_name) for meal in meals])
+            cells.append(cell)
+        weeks.setdefault(week_id(date_str), []).append(
+            [date_obj.strftime('%d.%m.%Y'), mensa_calendar.WEEKDAY_NAMES[date_obj.weekday()], cells])
+    
+    manifest_weeks = []
+    for week, rows in weeks.items():
+        file_name = f"week-{week}.json"
+        write_json(os.path.join(data_dir, file_name), rows, compact=True)
+        manifest_weeks.append({"id": week, "file": file_name, "rows": len(rows)})
+    
+    # Wochen aus früheren Läufen aufräumen, samt vorkomprimierter Varianten
+    current = {week["file"] for week in manifest_weeks}
+    for file_name in os.listdir(data_dir):
+        week_file = mensa_assets.uncompressed_name(file_name)
+        if week_file.startswith("week-") and week_file.endswith(".json") and week_file not in current:
+            os.remove(os.path.join(data_dir, file_name))
+    
+    write_atomic(os.path.join(data_dir, "search.json"), [search_index.to_json()])
+    write_json(os.path.join(data_dir, "manifest.json"), {
+        "updated": datetime.now().strftime('%d.%m.%Y %H:%M'),
+        "mensen": mensen_namen,
+        "weeks": manifest_weeks,
+        "search": "search.json",
+        "stats": {"total_dishes": total_dishes, "total_days": len(dates_data),
+                  "bratwurst_count": tag_counts['bratwurst'],
+                  "extra": extra_stat_items(tag_counts, price_summary)},
+    }, compact=True)
+    chunks = iter_shell_html(assets)
+    write_atomic(html_path, mensa_assets.minify_markup(chunks) if assets else chunks)
+
+COMMANDS = ("scrape", "scrape-one", "render")
+
+def parse_args(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Ohne Unterbefehl wird gescrapt - bestehende Aufrufe (Workflow, cron) bleiben gültig
+    if not argv or argv[0] not in COMMANDS + ("-h", "--help"):
+        argv = ["scrape"] + argv
+    
+    output_options = argparse.ArgumentParser(add_help=False)
+    output_options.add_argument("--output", choices=["inline", "split"], default="inline",
+                                help="inline: alles in index.html, split: JSON-Payload in data/ plus statische Shell")
+    output_options.add_argument("--watchlist", metavar="JSON",
+                                help="Watchlist aus Datei laden ({\"tag\": [\"begriff\", ...]}), Standard: WATCHLIST")
+    output_options.add_argument("--compact", action="store_true",
+                                help="Zusätzlich mensen_data.compact.json mit String-Tabelle schreiben")
+    output_options.add_argument("--gzip", action="store_true", help="Kompaktes Format zusätzlich als .gz vorkomprimieren")
+    output_options.add_argument("--assets", action="store_true",
+                                help="CSS/JS als Dateien mit Inhalts-Hash unter assets/ auslagern und Markup minifizieren")
+    output_options.add_argument("--precompress", action="store_true",
+                                help="Zu jedem Artefakt .gz- und (mit brotli) .br-Dateien schreiben")
+    output_options.add_argument("--metrics", metavar="JSON", nargs="?", const=METRICS_FILE,
+                                help="Laufzeit pro Phase und Zähler pro Mensa als JSON speichern (Standard: mensen_metrics.json)")
+    output_options.add_argument("--trace", metavar="JSON", nargs="?", const=TRACE_FILE,
+                                help="Trace im Chrome-Trace-Event-Format speichern (Standard: mensen_trace.json)")
+    
+    scrape_options = argparse.ArgumentParser(add_help=False)
+    scrape_options.add_argument("--backend", choices=["http", "chrome"], default="http",
+                                help="http: direkte XHR-Requests (Chrome nur als Fallback), chrome: immer Selenium")
+    scrape_options.add_argument("--config", default=MENSEN_FILE,
+                                help="Mensa-Registry (JSON), ohne Datei gelten die eingebauten Mensen")
+    scrape_options.add_argument("--days", type=int, help="Anzahl Tage ab heute für alle Mensen (Standard: Horizont je Mensa)")
+    scrape_options.add_argument("--workers", type=int, help="Anzahl paralleler Worker (Standard: eine pro Mensa)")
+    scrape_options.add_argument("--rps", type=float,
+                                help=f"Maximale Requests pro Sekunde über alle Worker, 0 = unbegrenzt "
+                                     f"(Standard: requests_per_second der Registry bzw. {REQUESTS_PER_SECOND:g})")
+    scrape_options.add_argument("--pool", choices=["drivers", "tabs"], default="drivers",
+                                help="drivers: eigener Chrome pro Worker, tabs: ein Chrome mit mehreren Tabs")
+    scrape_options.add_argument("--memory-budget", type=int, default=MEMORY_BUDGET_MB,
+                                help="Speicherbudget in MB, begrenzt die Anzahl gleichzeitiger Chrome-Worker")
+    scrape_options.add_argument("--no-block", action="store_true",
+                                help="Chrome lädt alle Ressourcen (kein Request-Filter, z.B. zum Vergleich)")
+    scrape_options.add_argument("--parse-workers", type=int, default=PARSE_WORKERS,
+                                help="Threads, die parallel zum Laden parsen (0: Laden und Parsen nacheinander)")
+    scrape_options.add_argument("--day-timeout", type=float, default=DAY_TIMEOUT,
+                                help="Maximale Wartezeit in s auf den Speiseplan eines Tages")
+    scrape_options.add_argument("--archive", metavar="DB", nargs="?", const=mensa_archive.ARCHIVE_FILE,
+                                help="Ergebnisse zusätzlich ins SQLite-Archiv übernehmen (Standard: mensen_archive.sqlite)")
+    scrape_options.add_argument("--incremental", action="store_true",
+                                help="Unveränderte Tage aus dem letzten mensen_data.json wiederverwenden")
+    scrape_options.add_argument("--refresh-days", type=int, default=REFRESH_DAYS,
+                                help="Inkrementell: die ersten N Tage immer neu scrapen")
+    scrape_options.add_argument("--sample-rate", type=float, default=SAMPLE_RATE,
+                                help="Inkrementell: Anteil der übrigen Tage, der trotzdem neu gescrapt wird")
+    scrape_options.add_argument("--max-age", type=int, default=MAX_AGE_DAYS,
+                                help=f"Inkrementell: Tage spätestens nach N Tagen neu scrapen, Tage mit "
+                                     f"unverändertem Hash später (bis {STABLE_MAX_AGE_DAYS} Tage)")
+    scrape_options.add_argument("--all-days", action="store_true",
+                                help="Auch Wochenenden, Feiertage und laut Archiv geschlossene Wochentage scrapen")
+    scrape_options.add_argument("--resume", action="store_true",
+                                help="Heute bereits gescrapte Tage aus mensen_checkpoint.jsonl übernehmen, nur den Rest scrapen")
+    scrape_options.add_argument("--render-partial", action="store_true",
+                                help="Nicht scrapen, nur den Stand aus dem Checkpoint rendern (z.B. nach einem Timeout)")
+    scrape_options.add_argument("--force", action="store_true",
+                                help="Auch ohne inhaltliche Änderung neu rendern und schreiben (z.B. nach Template-Änderungen)")
     
+    parser = argparse.ArgumentParser(description="Bratwurst Frühwarnsystem - Mensen Scraper")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("scrape", parents=[scrape_options, output_options],
+                          help="Alle aktiven Mensen scrapen und rendern (Standard)")
+    one_parser = subparsers.add_parser("scrape-one", parents=[scrape_options, output_options],
+                                       help="Nur eine Mensa scrapen, die übrigen aus mensen_data.json übernehmen")
+    one_parser.add_argument("mensa", help="Name der Mensa in der Registry (auch wenn sie deaktiviert ist)")
+    render_parser = subparsers.add_parser("render", parents=[output_options],
+                                          help="Nur index.html aus einem vorhandenen Datensatz rendern, ohne Chrome")
+    render_parser.add_argument("--data", default=DATA_FILE,
+                               help="Datensatz: mensen_data.json oder kompaktes Format, auch .gz (Standard: %(default)s)")
+    return parser.parse_args(argv)
+
+def load_matcher(path):
+    """Matcher für --watchlist - ohne Angabe die eingebaute WATCHLIST
+    
+    Eine ausdrücklich angegebene Datei muss lesbar sein ({"tag": ["begriff", ...]}), sonst bricht
+    der Lauf ab, statt still mit der Standard-Watchlist falsch hervorzuheben.
+    """
+    if not path:
+        return mensa_watchlist.DEFAULT_MATCHER
     try:
-        for mensa_name, url in MENSEN.items():
-            speiseplan = scrape_mensa(driver, url, mensa_name, days=31)
-            all_data[mensa_name] = speiseplan
-    finally:
-        driver.quit()
+        with open(path, encoding="utf-8") as f:
+            watchlist = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"❌ Watchlist {path} nicht lesbar: {e}")
+        sys.exit(2)
+    if not (isinstance(watchlist, dict) and all(
+            isinstance(keywords, list) and all(isinstance(keyword, str) for keyword in keywords)
+            for keywords in watchlist.values())):
+        print(f"❌ Watchlist {path} hat nicht das Format {{\"tag\": [\"begriff\", ...]}}")
+        sys.exit(2)
+    return mensa_watchlist.WatchlistMatcher(watchlist)
+
+def render_outputs(all_data, args, matcher):
+    """Klassifiziert den Datensatz und schreibt index.html (plus optional das kompakte Format)"""
+    # Jedes Gericht einmalig klassifizieren und Preise parsen
+    with METRICS.span("enrich"):
+        all_data = enrich_data(all_data, matcher)
     
     # HTML generieren
     print("\n📝 Generiere HTML-Seite...")
-    html_content = generate_html(all_data)
-    
-    with open("index.html", "w", encoding="utf-8") as f:
-        f.write(html_content)
+    with METRICS.span("render"):
+        if args.output == "split":
+            write_split(all_data, "index.html", assets=args.assets)
+        else:
+            write_html(all_data, "index.html", assets=args.assets)
     
     print("✅ index.html erfolgreich erstellt!")
     
-    # JSON für später speichern (optional)
-    with open("mensen_data.json", "w", encoding="utf-8") as f:
-        json.dump(all_data, f, ensure_ascii=False, indent=2)
+    artifacts = ["index.html"]
+    if args.output == "split":
+        artifacts += [os.path.join(SPLIT_DATA_DIR, file_name) for file_name in sorted(os.listdir(SPLIT_DATA_DIR))
+                      if file_name.endswith(".json")]
+    if args.assets:
+        variant = "shell" if args.output == "split" else "page"
+        artifacts += write_assets(page_assets(variant, external=True)[2])
+        print(f"✅ CSS/JS unter {mensa_assets.ASSETS_DIR}/ gespeichert!")
+    
+    if args.compact:
+        write_compact(mensa_compact.COMPACT_FILE, all_data, gzipped=args.gzip and not args.precompress)
+        artifacts.append(mensa_compact.COMPACT_FILE)
+        print(f"✅ {mensa_compact.COMPACT_FILE} gespeichert!")
     
-    print("✅ mensen_data.json gespeichert!")
+    if args.precompress:
+        write_precompressed(artifacts)
+        print(f"✅ {len(artifacts)} Dateien vorkomprimiert ({', '.join(suffix for _, suffix in mensa_assets.ENCODINGS)})")
+    return all_data
+
+def finish_run(args):
+    METRICS.print_summary()
+    if args.metrics:
+        METRICS.write_summary(args.metrics)
+        print(f"✅ Metriken in {args.metrics} gespeichert!")
+    if args.trace:
+        METRICS.write_trace(args.trace)
+        print(f"✅ Trace in {args.trace} gespeichert!")
     print("\n🎉 Bratwurst Frühwarnsystem beendet!")
 
+def run_render(args):
+    """Rendert nur aus einem vorhandenen Datensatz - ohne Selenium, BeautifulSoup und requests"""
+    matcher = load_matcher(args.watchlist)
+    all_data = load_data(args.data)
+    if all_data is None:
+        print(f"❌ Kein lesbarer Datensatz in {args.data}")
+        sys.exit(1)
+    print(f"📂 {len(all_data)} Mensen aus {args.data} geladen")
+    render_outputs(all_data, args, matcher)
+    finish_run(args)
+
+def run_scrape(args):
+    print("🌭 Bratwurst Frühwarnsystem gestartet!")
+    print("=" * 60)
+    
+    # Vor dem Scrapen prüfen - ein Tippfehler im Pfad soll nicht erst nach dem Lauf auffallen
+    matcher = load_matcher(args.watchlist)
+    registry, config = load_registry(args.config)
+    single = args.command == "scrape-one"
+    if single:
+        enabled = [entry for entry in registry if entry["name"] == args.mensa]
+        if not enabled:
+            print(f"❌ Mensa '{args.mensa}' nicht in der Registry ({', '.join(entry['name'] for entry in registry)})")
+            sys.exit(2)
+    else:
+        enabled = [entry for entry in registry if entry["enabled"]]
+    mensen = {entry["name"]: entry["url"] for entry in enabled}
+    horizons = {entry["name"]: day_range(args.days or entry["days"]) for entry in enabled}
+    priorities = {entry["name"]: entry["priority"] for entry in enabled}
+    rate = args.rps if args.rps is not None else config.get("requests_per_second", REQUESTS_PER_SECOND)
+    blocked_urls = [] if args.no_block else blocked_url_patterns(config.get("request_filter", REQUEST_FILTER))
+    print(f"📋 {len(mensen)} von {len(registry)} Mensen aktiv")
+    
+    # Geschlossene Tage gar nicht erst planen: Wochenende, Feiertage, laut Archiv nie geöffnete Wochentage
+    skipped = {mensa_name: {} for mensa_name in mensen}
+    if not args.all_days:
+        served = {}
+        if args.archive and os.path.exists(args.archive):
+            conn = mensa_archive.connect(args.archive)
+            served = {mensa_name: mensa_archive.served_weekdays(conn, mensa_name, mensa_calendar.MIN_ARCHIVE_WEEKS)
+                      for mensa_name in mensen}
+            conn.close()
+        for entry in enabled:
+            weekdays = mensa_calendar.open_weekdays(entry.get("weekdays"), served.get(entry["name"]))
+            horizons[entry["name"]], skipped[entry["name"]] = mensa_calendar.plan_days(horizons[entry["name"]], weekdays)
+        print(f"📅 Kalender: {sum(map(len, skipped.values()))} geschlossene Tage übersprungen")
+    
+    # Mit scrape-one werden die übrigen Mensen unverändert aus dem letzten Lauf übernommen
+    last_run = load_data(DATA_FILE, {})
+    previous = last_run if args.incremental or single else {}
+    previous_state = load_json(STATE_FILE, {}) if args.incremental or single else {}
+    
+    if args.incremental:
+        plans = {mensa_name: plan_incremental(mensa_name, horizons[mensa_name], previous_state, args.refresh_days,
+                                              args.sample_rate, args.max_age)
+                 for mensa_name in mensen}
+        total = sum(len(planned) for planned in plans.values())
+        print(f"♻️  Inkrementell: {total} von {sum(map(len, horizons.values()))} Tagen werden neu gescrapt")
+    else:
+        plans = dict(horizons)
+    
+    # Heute schon Gescraptes aus einem abgebrochenen Lauf übernehmen
+    done = load_checkpoint() if args.resume or args.render_partial else {}
+    remaining = {mensa_name: [d for d in planned if d not in done.get(mensa_name, {})]
+                 for mensa_name, planned in plans.items()}
+    if done:
+        print(f"⏯️  Checkpoint: {sum(map(len, plans.values())) - sum(map(len, remaining.values()))} Tage "
+              f"bereits erledigt, {sum(map(len, remaining.values()))} fehlen noch")
+    
+    # Laufzeiten des letzten Laufs verbessern die Verteilung auf die Worker
+    day_costs = day_costs_from_metrics(load_json(args.metrics or METRICS_FILE, {}))
+    
+    failures = {}
+    if args.render_partial:
+        # Nichts scrapen: fehlende Tage behalten ihren alten Stand
+        results = {}
+        failures = remaining
+    else:
+        # scrape-one lässt den Checkpoint eines abgebrochenen vollen Laufs unangetastet
+        checkpoint = None if single else Checkpoint(resume=args.resume)
+        try:
+            with METRICS.span("scrape_all"):
+                results = scrape_all(mensen, backend=args.backend, workers=args.workers or len(mensen),
+                                     pool=args.pool, memory_budget_mb=args.memory_budget,
+                                     day_timeout=args.day_timeout, plans=remaining, failures=failures,
+                                     priorities=priorities, day_costs=day_costs, rate=rate,
+                                     parse_workers=args.parse_workers, blocked_urls=blocked_urls,
+                                     checkpoint=checkpoint, skipped=skipped)
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+    for mensa_name, failed in failures.items():
+        METRICS.count(mensa_name, "failures", len(failed))
+    for mensa_name, mensa_skipped in skipped.items():
+        METRICS.count(mensa_name, "skipped_days", len(mensa_skipped))
+    for mensa_name, days in done.items():
+        for date_str, day in days.items():
+            # Wie log_tag(): Tage ohne Gerichte zählen als erledigt, landen aber nicht im Speiseplan
+            if day.dish_count:
+                results.setdefault(mensa_name, {})[date_str] = day
+    all_data, state = merge_incremental(horizons, plans, results, failures, previous, previous_state)
+    calendar = {}
+    if single:
+        for mensa_name in previous.keys() - all_data.keys():
+            all_data[mensa_name] = previous[mensa_name]
+        for mensa_name in previous_state.keys() - state.keys():
+            state[mensa_name] = previous_state[mensa_name]
+        calendar = load_json(CALENDAR_FILE, {}).get("skipped", {})
+    calendar.update(skipped)
+    
+    # Nur rendern und schreiben, wenn sich der Inhalt gegenüber mensen_data.json geändert hat
+    with METRICS.span("diff"):
+        changes = mensa_changes.change_report(drop_past_days(last_run, horizons), all_data)
+    mensa_changes.print_changes(changes)
+    mensa_changes.write_github_output(changed=str(changes["changed"] or args.force).lower(),
+                                      fingerprint=changes["fingerprint"])
+    
+    # Zustand und Kalender immer, sie merken sich auch, wann zuletzt gescrapt wurde
+    write_json(STATE_FILE, state)
+    write_json(CALENDAR_FILE, {
+        "generated": datetime.today().strftime('%Y-%m-%d'),
+        "skipped": {mensa_name: dict(sorted(mensa_skipped.items())) for mensa_name, mensa_skipped in calendar.items()},
+    })
+    
+    if changes["changed"] or args.force:
+        all_data = render_outputs(all_data, args, matcher)
+        
+        # JSON für später speichern (optional)
+        write_json(DATA_FILE, mensa_model.to_json(all_data))
+        print("✅ mensen_data.json gespeichert!")
+        if changes["changed"]:
+            write_json(mensa_changes.CHANGES_FILE, changes)
+            print(f"✅ {mensa_changes.CHANGES_FILE} gespeichert!")
+        if args.precompress:
+            write_precompressed([DATA_FILE] + ([mensa_changes.CHANGES_FILE] if changes["changed"] else []))
+        
+        if args.archive:
+            with METRICS.span("archive"):
+                conn = mensa_archive.connect(args.archive)
+                rows = mensa_archive.archive_data(conn, all_data)
+                conn.close()
+            print(f"✅ {rows} Gerichte in {args.archive} archiviert!")
+    else:
+        print("⏭️  index.html und mensen_data.json bleiben unverändert (--force rendert trotzdem)")
+    
+    # Lauf vollständig - ein Teilstand bleibt für ein späteres --resume liegen
+    if not args.render_partial and not single and os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
+    
+    finish_run(args)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "render":
+        run_render(args)
+    else:
+        run_scrape(args)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stw_standin import StandIn  # noqa: E402
+
+@pytest.fixture
+def standin():
+    """Stand-in für stw.berlin auf einem freien Port"""
+    server = StandIn().start()
+    yield server
+    server.stop()
@@ -0,0 +1,146 @@
+"""
+Bratwurst Frühwarnsystem - Stand-in für stw.berlin
+Liefert die aufgezeichneten Antworten aus fixtures/stw aus: die Mensa-Seite für jeden GET
+und für POST auf den Speiseplan-Endpoint das Fragment des angefragten Tages. Tage ohne
+Aufzeichnung bekommen das Fragment des gleichen Wochentags, Wochenenden den geschlossenen Tag.
+
+Damit lassen sich HTTP- und Chrome-Backend, Parse-Pool und Dauerbetrieb ohne stw.berlin prüfen.
+
+Beispiel (Scraper und Daemon in einem leeren Verzeichnis, sie schreiben ins aktuelle):
+    python $REPO/tests/stw_standin.py --port 8765 --registry /tmp/standin_mensen.json
+    python $REPO/scrape_mensen.py --config /tmp/standin_mensen.json --rps 0 --days 7
+    python $REPO/mensa_daemon.py --config /tmp/standin_mensen.json --rps 0 --refresh 1
+"""
+
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs
+import argparse
+import json
+import os
+import threading
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "stw")
+XHR_PATH = "/xhr/speiseplan-wochentag.html"
+CLOSED_FRAGMENT = "geschlossen"
+# Antwort eines umgezogenen Endpoints: 200, aber kein Speiseplan
+ERROR_PAGE = "<!DOCTYPE html><html><body><h1>Seite nicht gefunden</h1></body></html>"
+MENSEN = ("Mensa Nord", "Mensa Süd", "Mensa Mitte")
+
+def read_fixture(*parts):
+    with open(os.path.join(FIXTURES_DIR, *parts), encoding="utf-8") as f:
+        return f.read()
+
+class StandIn(ThreadingHTTPServer):
+    """HTTP-Server mit den aufgezeichneten Antworten
+
+    'broken' simuliert einen umgezogenen Endpoint (200 mit Fehlerseite statt Fragment),
+    'xhr_status' einen, der den POST ablehnt (z.B. 404 oder 405),
+    'posts' sammelt alle angefragten (resources_id, datum).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0)):
+        super().__init__(address, StandInHandler)
+        self.page = read_fixture("mensa.html")
+        self.fragments = {os.path.splitext(name)[0]: read_fixture("xhr", name)
+                          for name in os.listdir(os.path.join(FIXTURES_DIR, "xhr"))}
+        # Wochentag -> aufgezeichneter Tag, für Anfragen außerhalb der Aufzeichnung
+        self.by_weekday = {datetime.strptime(date_str, '%Y-%m-%d').weekday(): date_str
+                           for date_str in sorted(self.fragments) if date_str != CLOSED_FRAGMENT}
+        self.broken = False
+        self.xhr_status = 200
+        self.posts = []
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, mensa_name):
+        return f"{self.base_url}/mensen/{mensa_name.lower().replace(' ', '-')}.html"
+
+    def registry(self, mensen=MENSEN):
+        """Registry im Format von mensen.json, alle Mensen zeigen auf den Stand-in"""
+        return {"requests_per_second": 0, "mensen": [{"name": name, "url": self.url(name)} for name in mensen]}
+
+    def fragment(self, date_str):
+        if date_str in self.fragments:
+            return self.fragments[date_str]
+        try:
+            weekday = datetime.strptime(date_str, '%Y-%m-%d').weekday()
+        except ValueError:
+            return self.fragments[CLOSED_FRAGMENT]
+        return self.fragments[self.by_weekday.get(weekday, CLOSED_FRAGMENT)]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="stw-standin", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_html(self, status, html):
+        body = html.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0].endswith(".html"):
+            self.send_html(200, self.server.page)
+        else:
+            self.send_html(404, ERROR_PAGE)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        if self.path.split("?", 1)[0] != XHR_PATH:
+            self.send_html(404, ERROR_PAGE)
+            return
+        resources_id = form.get("resources_id", [""])[0]
+        date_str = form.get("date", [""])[0]
+        with self.server.lock:
+            self.server.posts.append((resources_id, date_str))
+        if self.server.xhr_status != 200:
+            self.send_html(self.server.xhr_status, ERROR_PAGE)
+            return
+        self.send_html(200, ERROR_PAGE if self.server.broken else self.server.fragment(date_str))
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in für stw.berlin mit aufgezeichneten Antworten")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse des Servers")
+    parser.add_argument("--port", type=int, default=8765, help="Port des Servers")
+    parser.add_argument("--registry", help="Mensa-Registry für den Stand-in hierhin schreiben (für --config)")
+    parser.add_argument("--broken", action="store_true", help="Endpoint liefert eine Fehlerseite statt Fragmenten")
+    parser.add_argument("--xhr-status", type=int, default=200, help="HTTP-Status des Endpoints, z.B. 404 oder 405")
+    args = parser.parse_args()
+
+    server = StandIn((args.host, args.port))
+    server.broken = args.broken
+    server.xhr_status = args.xhr_status
+    if args.registry:
+        with open(args.registry, "w", encoding="utf-8") as f:
+            json.dump(server.registry(), f, ensure_ascii=False, indent=2)
+        print(f"✅ Registry in {args.registry} gespeichert")
+    print(f"🌭 Stand-in für stw.berlin läuft auf {server.base_url}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Beendet")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
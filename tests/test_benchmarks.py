@@ -0,0 +1,20 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import bench_pipeline  # noqa: E402
+
+def test_pipeline_benchmark_records_and_compares(tmp_path):
+    # Winziger Datensatz - es geht nur darum, dass --output und --baseline durchlaufen
+    output = tmp_path / "bench.json"
+    options = ["--mensen", "2", "--days", "3", "--repeat", "1", "--parse-iterations", "1"]
+
+    bench_pipeline.main(options + ["--output", str(output)])
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert report["meta"]["mensen"] == 2
+    assert report["results"]
+
+    # Gegen sich selbst mit großzügiger Schwelle: keine Regression, kein sys.exit
+    bench_pipeline.main(options + ["--baseline", str(output), "--threshold", "1000"])
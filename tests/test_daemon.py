@@ -0,0 +1,101 @@
+from argparse import Namespace
+from http.server import ThreadingHTTPServer
+import gzip
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from mensa_metrics import Metrics
+from mensa_model import DayPlan, Meal
+import mensa_changes
+import mensa_daemon
+import mensa_watchlist
+import scrape_mensen
+
+WEEK = ["2026-03-02", "2026-03-03", "2026-03-04", "2026-03-05", "2026-03-06"]
+
+def get(url, **headers):
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+def test_keep_last_bounds_spans():
+    metrics = Metrics()
+    for _ in range(5):
+        with metrics.span("scrape", "Mensa"):
+            pass
+    metrics.keep_last(3)
+    for _ in range(5):
+        with metrics.span("scrape", "Mensa"):
+            pass
+
+    assert len(metrics.spans) == 3
+    assert metrics.summary()["phases"]["scrape"]["count"] == 3
+
+def test_slow_render_does_not_overwrite_newer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    enrich_data = scrape_mensen.enrich_data
+    calls = []
+
+    def slow_first_enrich(all_data, matcher):
+        calls.append(all_data)
+        if len(calls) == 1:
+            time.sleep(0.3)
+        return enrich_data(all_data, matcher)
+
+    monkeypatch.setattr(scrape_mensen, "enrich_data", slow_first_enrich)
+    snapshot = mensa_daemon.Snapshot({}, {})
+    old = {"2026-03-02": DayPlan([], [Meal("Bratwurst", "€ 2,95/4,50/5,30")])}
+    new = {"2026-03-02": DayPlan([], [Meal("Currywurst", "€ 2,95/4,50/5,30")])}
+
+    first = threading.Thread(target=snapshot.update, args=("Mensa Nord", old, {}, mensa_watchlist.DEFAULT_MATCHER))
+    first.start()
+    time.sleep(0.1)
+    snapshot.update("Mensa Nord", new, {}, mensa_watchlist.DEFAULT_MATCHER)
+    first.join()
+
+    # Der langsame erste Durchlauf darf den neueren Stand nicht mehr ersetzen
+    assert snapshot.fingerprint == mensa_changes.fingerprint({"Mensa Nord": new})
+    assert "Currywurst" in snapshot.response("/")[1].decode("utf-8")
+    assert "Currywurst" in (tmp_path / "index.html").read_text(encoding="utf-8")
+
+def test_refresh_serves_snapshot(standin, tmp_path, monkeypatch):
+    # Snapshot.render schreibt ins aktuelle Verzeichnis
+    monkeypatch.chdir(tmp_path)
+    metrics = Metrics()
+    monkeypatch.setattr(mensa_daemon, "METRICS", metrics)
+    monkeypatch.setattr(mensa_daemon, "MAX_SPANS", 4)
+    # Die aufgezeichnete Woche statt ab heute - die Navigation kennt nur diese Tage
+    monkeypatch.setattr(scrape_mensen, "day_range", lambda days: WEEK)
+    snapshot = mensa_daemon.Snapshot({}, {})
+    args = Namespace(backend="http", days=None, refresh=None, workers=1)
+    registry = [{"name": "Mensa Nord", "url": standin.url("Mensa Nord"), "days": 5, "priority": 0}]
+    daemon = mensa_daemon.Daemon(registry, args, snapshot, mensa_watchlist.DEFAULT_MATCHER, 0, [])
+    daemon.stop.set()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), mensa_daemon.make_handler(snapshot))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        assert get(base_url + "/")[0] == 503
+        for _ in range(3):
+            daemon.refresh("Mensa Nord")
+        daemon.close()
+
+        status, headers, body = get(base_url + "/")
+        assert status == 200
+        assert "Bratwurst mit Currysauce" in body.decode("utf-8")
+        assert get(base_url + "/", **{"If-None-Match": headers["ETag"]})[0] == 304
+        status, headers, compressed = get(base_url + "/", **{"Accept-Encoding": "gzip"})
+        assert headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(compressed) == body
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert (tmp_path / "index.html").exists()
+    # Drei Aktualisierungen, aber nur die jüngsten Spannen bleiben
+    assert len(metrics.spans) == 4
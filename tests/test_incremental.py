@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from mensa_model import DayPlan, Meal
+import scrape_mensen
+
+def days_ago(days):
+    return (datetime.today() - timedelta(days=days)).strftime('%Y-%m-%d')
+
+def test_stable_hash_stretches_max_age():
+    dates = scrape_mensen.day_range(10)
+    late = dates[8:]
+    state = {"Mensa": {
+        late[0]: {"hash": "a", "scraped": days_ago(5), "stable": 0},
+        late[1]: {"hash": "b", "scraped": days_ago(5), "stable": 2},
+    }}
+
+    planned = scrape_mensen.plan_incremental("Mensa", dates, state, refresh_days=8, sample_rate=0, max_age_days=4)
+
+    # Zuletzt geänderter Tag nach 4 Tagen neu, stabiler Tag darf älter werden
+    assert planned == dates[:8] + [late[0]]
+
+def test_stable_counts_unchanged_rescrapes_once_per_day():
+    date_str = scrape_mensen.day_range(1)[0]
+    day = DayPlan([], [Meal("Bratwurst", "€ 2,95/4,50/5,30")])
+    changed = DayPlan([], [Meal("Bratwurst", "€ 3,10/4,50/5,30")])
+    state = {"Mensa": {date_str: {"hash": scrape_mensen.day_hash(day), "scraped": days_ago(1), "stable": 1}}}
+
+    def merge(result, state):
+        return scrape_mensen.merge_incremental({"Mensa": [date_str]}, {"Mensa": [date_str]},
+                                               {"Mensa": {date_str: result}}, {}, {}, state)[1]
+
+    state = merge(day, state)
+    assert state["Mensa"][date_str]["stable"] == 2
+    # Zweiter Scrape am selben Tag zählt nicht noch einmal
+    assert merge(day, state)["Mensa"][date_str]["stable"] == 2
+    assert merge(changed, state)["Mensa"][date_str]["stable"] == 0
+
+def test_reused_day_without_state_stays_due():
+    dates = scrape_mensen.day_range(10)
+    date_str = dates[9]
+    day = DayPlan([], [Meal("Bratwurst", "€ 2,95/4,50/5,30")])
+
+    # Tag aus mensen_data.json ohne State-Eintrag, heute nicht geplant
+    _, state = scrape_mensen.merge_incremental({"Mensa": dates}, {"Mensa": []}, {}, {},
+                                               {"Mensa": {date_str: day}}, {})
+
+    assert "scraped" not in state["Mensa"][date_str]
+    planned = scrape_mensen.plan_incremental("Mensa", dates, state, refresh_days=8, sample_rate=0, max_age_days=4)
+    assert date_str in planned
+
+def test_refresh_days_count_calendar_days():
+    dates = scrape_mensen.day_range(14)
+    # Jeden zweiten Tag weggefiltert, wie Wochenenden und Feiertage durch plan_days()
+    open_dates = dates[::2]
+    state = {"Mensa": {date_str: {"hash": "a", "scraped": days_ago(0), "stable": 0} for date_str in open_dates}}
+
+    planned = scrape_mensen.plan_incremental("Mensa", open_dates, state, refresh_days=4, sample_rate=0, max_age_days=4)
+
+    # Nur heute bis heute+3, nicht die ersten vier verbliebenen Einträge
+    assert planned == [dates[0], dates[2]]
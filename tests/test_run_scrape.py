@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from mensa_metrics import Metrics
+import scrape_mensen
+
+WEEK = ["2026-03-02", "2026-03-03", "2026-03-04", "2026-03-05", "2026-03-06"]
+
+def run(standin, tmp_path, monkeypatch, *argv, dates=WEEK):
+    """Ein kompletter Lauf gegen den Stand-in im leeren Verzeichnis tmp_path, gibt die Step-Outputs zurück"""
+    monkeypatch.chdir(tmp_path)
+    output = tmp_path / "github_output"
+    output.write_text("", encoding="utf-8")
+    monkeypatch.setenv("GITHUB_OUTPUT", str(output))
+    monkeypatch.setattr(scrape_mensen, "METRICS", Metrics())
+    # Die aufgezeichnete Woche statt ab heute - die Navigation kennt nur diese Tage
+    monkeypatch.setattr(scrape_mensen, "day_range", lambda days: list(dates))
+    registry = tmp_path / "registry.json"
+    registry.write_text(json.dumps(standin.registry(["Mensa Nord", "Mensa Süd"])), encoding="utf-8")
+    scrape_mensen.main([*argv, "--config", str(registry), "--rps", "0"])
+    return dict(line.split("=", 1) for line in output.read_text(encoding="utf-8").splitlines())
+
+def test_scrape_one_keeps_checkpoint(standin, tmp_path, monkeypatch):
+    # Teilstand eines abgebrochenen vollen Laufs
+    checkpoint = tmp_path / scrape_mensen.CHECKPOINT_FILE
+    checkpoint.write_text('{"scraped": "2026-03-02", "mensa": "Mensa Süd"}\n', encoding="utf-8")
+
+    run(standin, tmp_path, monkeypatch, "scrape-one", "Mensa Nord")
+
+    assert checkpoint.read_text(encoding="utf-8") == '{"scraped": "2026-03-02", "mensa": "Mensa Süd"}\n'
+    assert list(json.loads((tmp_path / scrape_mensen.DATA_FILE).read_text(encoding="utf-8"))) == ["Mensa Nord"]
+
+def test_full_run_removes_checkpoint(standin, tmp_path, monkeypatch):
+    run(standin, tmp_path, monkeypatch, "scrape")
+
+    assert not (tmp_path / scrape_mensen.CHECKPOINT_FILE).exists()
+
+def test_window_moved_by_one_day_is_unchanged(standin, tmp_path, monkeypatch):
+    assert run(standin, tmp_path, monkeypatch, "scrape")["changed"] == "true"
+    # Ein Tag später: der Vortag ist aus dem Horizont gefallen, die übrigen Speisepläne sind gleich
+    assert run(standin, tmp_path, monkeypatch, "scrape", dates=WEEK[1:])["changed"] == "false"
+
+def test_missing_watchlist_aborts(standin, tmp_path, monkeypatch):
+    # Tippfehler im Pfad: Abbruch vor dem Scrapen statt still die Standard-Watchlist
+    with pytest.raises(SystemExit) as exit_info:
+        run(standin, tmp_path, monkeypatch, "scrape", "--watchlist", "watchlsit.json")
+
+    assert exit_info.value.code == 2
+    assert standin.posts == []
+
+def test_watchlist_file_is_used(standin, tmp_path, monkeypatch):
+    (tmp_path / "watchlist.json").write_text('{"spaetzle": ["spätzle"]}', encoding="utf-8")
+
+    run(standin, tmp_path, monkeypatch, "scrape", "--watchlist", "watchlist.json")
+
+    assert "Käsespätzle" in (tmp_path / "index.html").read_text(encoding="utf-8")
+    data = json.loads((tmp_path / scrape_mensen.DATA_FILE).read_text(encoding="utf-8"))
+    tags = {tag for days in data.values() for day in days.values() for meals in day.values()
+            for meal in meals for tag in meal["tags"]}
+    assert tags == {"spaetzle"}
@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import mensa_model
+import scrape_mensen
+
+# Aufgezeichnete Woche: Mo-Fr mit Speiseplan, Sa geschlossen
+WEEK = ["2026-03-02", "2026-03-03", "2026-03-04", "2026-03-05", "2026-03-06", "2026-03-07"]
+
+def scrape(standin, dates=WEEK, **kwargs):
+    failed = []
+    session = scrape_mensen.setup_session()
+    try:
+        speiseplan = scrape_mensen.scrape_mensa_http(session, standin.url("Mensa Nord"), "Mensa Nord",
+                                                     dates=dates, failed=failed, **kwargs)
+    finally:
+        session.close()
+    return speiseplan, failed
+
+def test_scrapes_recorded_days(standin):
+    speiseplan, failed = scrape(standin)
+
+    assert failed == []
+    # Geschlossene Tage sind leer, aber kein Fehler
+    assert sorted(speiseplan) == WEEK[:5]
+    monday = speiseplan["2026-03-02"]
+    assert [meal.name for meal in monday.aktionen] == ["Bratwurst mit Currysauce und Pommes frites"]
+    assert [meal.name for meal in monday.essen] == ["Käsespätzle mit Röstzwiebeln", "Gemüse-Curry mit Basmatireis"]
+    assert monday.aktionen[0].preis == "€ 2,95/4,50/5,30"
+    assert monday.aktionen[0].preise == (2.95, 4.5, 5.3)
+    # Vorspeisen, Salate, Beilagen und Desserts gehören nicht dazu
+    all_names = {meal.name for day in speiseplan.values() for _, meals in day.kategorien() for meal in meals}
+    assert not all_names & {"Tomatencremesuppe", "Große Salatschale", "Pommes frites", "Schokoladenpudding"}
+    assert {resources_id for resources_id, _ in standin.posts} == {"321"}
+
+def test_skips_days_missing_from_navigation(standin):
+    skipped = {}
+    speiseplan, failed = scrape(standin, dates=["2026-03-01"] + WEEK[:2], skipped=skipped)
+
+    assert list(skipped) == ["2026-03-01"]
+    assert [date_str for _, date_str in standin.posts] == WEEK[:2]
+    assert sorted(speiseplan) == WEEK[:2]
+    assert failed == []
+
+def test_parse_pool_gives_same_result(standin):
+    inline, _ = scrape(standin)
+    with ThreadPoolExecutor(max_workers=2) as parse_pool:
+        pooled, failed = scrape(standin, parse_pool=parse_pool)
+
+    assert failed == []
+    assert mensa_model.to_json({"Mensa Nord": pooled}) == mensa_model.to_json({"Mensa Nord": inline})
+
+def test_moved_endpoint_falls_back_to_chrome(standin):
+    standin.broken = True
+    speiseplan, failed = scrape(standin)
+
+    # None: der Aufrufer nimmt Chrome, die Tage gelten nicht als leer gescrapt
+    assert speiseplan is None
+    assert failed == []
+
+def test_rejected_endpoint_falls_back_to_chrome(standin):
+    standin.xhr_status = 404
+    failed = ["2026-02-27"]
+    session = scrape_mensen.setup_session()
+    try:
+        speiseplan = scrape_mensen.scrape_mensa_http(session, standin.url("Mensa Nord"), "Mensa Nord",
+                                                     dates=WEEK, failed=failed)
+    finally:
+        session.close()
+
+    # HTTP-Fehler an jedem Tag: Chrome übernimmt, die gemeinsame failed-Liste bleibt wie sie war
+    assert speiseplan is None
+    assert failed == ["2026-02-27"]
+
+def test_missing_resources_id_falls_back_to_chrome(standin):
+    standin.page = "<html><body><div id=\"spltag1\"></div></body></html>"
+    speiseplan, _ = scrape(standin)
+
+    assert speiseplan is None
+    assert standin.posts == []
@@ -0,0 +1,54 @@
+from mensa_metrics import Metrics
+import scrape_mensen
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def new_window(self, kind):
+        self.driver.counter += 1
+        handle = f"tab-{self.driver.counter}"
+        self.driver.handles.append(handle)
+        self.driver.current_window_handle = handle
+
+    def window(self, handle):
+        assert handle in self.driver.handles
+        self.driver.current_window_handle = handle
+
+class FakeDriver:
+    """Nur die Tab-Verwaltung eines Chrome-Drivers"""
+
+    def __init__(self):
+        self.counter = 0
+        self.handles = ["tab-0"]
+        self.current_window_handle = "tab-0"
+        self.switch_to = FakeSwitchTo(self)
+
+    def close(self):
+        self.handles.remove(self.current_window_handle)
+        self.current_window_handle = None
+
+    def execute_script(self, script, *args):
+        return ""
+
+def test_failed_tabs_are_closed(monkeypatch):
+    metrics = Metrics()
+    monkeypatch.setattr(scrape_mensen, "METRICS", metrics)
+    monkeypatch.setattr(scrape_mensen, "block_requests", lambda driver, patterns: None)
+    monkeypatch.setattr(scrape_mensen, "open_mensa", lambda driver, url, mensa_name, limiter=None: mensa_name != "B")
+    monkeypatch.setattr(scrape_mensen, "trigger_day", lambda driver, date_str, limiter=None: 0.0)
+    monkeypatch.setattr(scrape_mensen, "wait_for_day", lambda driver, started, timeout: 0.0)
+    monkeypatch.setattr(scrape_mensen, "read_speiseplan", lambda driver: "")
+    driver = FakeDriver()
+    mensen = {"A": "a", "B": "b", "C": "c"}
+    failures = {}
+
+    scrape_mensen.scrape_mensen_tabs(driver, mensen, {name: ["2026-03-02"] for name in mensen}, failures=failures)
+
+    # Der Tab von B wurde geschlossen, nach dem Batch bleibt nur der erste Tab
+    assert driver.handles == ["tab-0"]
+    assert driver.current_window_handle == "tab-0"
+    assert failures["B"] == ["2026-03-02"]
+    # Jede Mensa hat eine scrape-Phase für day_costs_from_metrics()
+    assert set(metrics.summary()["mensen"]) == {"A", "B", "C"}
+    assert all("scrape" in values["phases"] for values in metrics.summary()["mensen"].values())
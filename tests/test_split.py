@@ -0,0 +1,19 @@
+import json
+
+from mensa_model import DayPlan, Meal
+import mensa_watchlist
+import scrape_mensen
+
+def test_split_payload_marks_cheapest_dish(tmp_path):
+    all_data = scrape_mensen.enrich_data({"Mensa Nord": {"2026-03-02": DayPlan(
+        [Meal("Bratwurst mit Pommes", "€ 2,95/4,50/5,30")],
+        [Meal("Käsespätzle", "€ 1,95/3,50/4,30")],
+    )}}, mensa_watchlist.DEFAULT_MATCHER)
+
+    scrape_mensen.write_split(all_data, html_path=str(tmp_path / "index.html"), data_dir=str(tmp_path / "data"))
+
+    rows = json.loads((tmp_path / "data" / "week-2026-W10.json").read_text(encoding="utf-8"))
+    aktionen, essen = rows[0][2][0]
+    # Wie im Inline-Renderer: das günstigste Gericht des Tages bekommt die Klasse "cheapest"
+    assert aktionen == [["Bratwurst mit Pommes", "€ 2,95/4,50/5,30", ["bratwurst"]]]
+    assert essen == [["Käsespätzle", "€ 1,95/3,50/4,30", [], 1]]